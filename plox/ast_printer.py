@@ -1,48 +1,221 @@
-from expr import Expr, ExprVisitor, Binary, Grouping, Literal, Unary
+import argparse
+import functools
+import inspect
+import io
+import json
+import sys
+from typing import Any, Iterator, TextIO
+
+from expr import (
+    Assign,
+    Binary,
+    Call,
+    Expr,
+    ExprVisitor,
+    Grouping,
+    Index,
+    ListLiteral,
+    Literal,
+    Logical,
+    MapLiteral,
+    SetIndex,
+    Unary,
+    Variable,
+)
+from stmt import Block, Expression, If, Import, Print, Stmt, StmtVisitor, Var, While
 from tokens import Token, TokenType
-from typing import Any
+
+Node = Expr | Stmt
 
 
-class AstPrinter(ExprVisitor):
+class AstPrinter(ExprVisitor, StmtVisitor):
     @staticmethod
     def main() -> None:
-        expression = Binary(
-            Unary(
-                Token(TokenType.MINUS, "-", None, 1),
-                Literal(123),
-            ),
-            Token(TokenType.STAR, "*", None, 1),
-            Grouping(Literal(45.67)),
+        argument_parser = argparse.ArgumentParser(prog="ast_printer")
+        argument_parser.add_argument("script", nargs="?")
+        argument_parser.add_argument(
+            "--format", choices=("sexp", "json"), default="sexp"
+        )
+        args = argument_parser.parse_args()
+
+        if args.script is None:
+            expression = Binary(
+                Unary(
+                    Token(TokenType.MINUS, "-", None, 1),
+                    Literal(123),
+                ),
+                Token(TokenType.STAR, "*", None, 1),
+                Grouping(Literal(45.67)),
+            )
+
+            print(AstPrinter().print(expression))
+            return
+
+        from lox import Lox
+        from parser import Parser
+        from scanner import Scanner
+
+        with open(args.script) as file:
+            tokens = Scanner(file.read()).scan_tokens()
+        statements = Parser(tokens).parse()
+        if Lox.had_error:
+            exit(65)
+
+        AstPrinter(args.format).write(statements, sys.stdout)
+
+    def __init__(self, format: str = "sexp") -> None:
+        self.format = format
+
+    def print(self, node: Node) -> str:
+        out = io.StringIO()
+        self.write([node], out)
+        return out.getvalue().rstrip("\n")
+
+    def write(self, nodes: list[Stmt] | list[Node], out: TextIO) -> None:
+        if self.format == "json":
+            self.write_json(nodes, out)
+        else:
+            self.write_sexp(nodes, out)
+
+    def write_sexp(self, nodes: list[Stmt] | list[Node], out: TextIO) -> None:
+        for node in nodes:
+            stack: list[Any] = ["\n", node]
+            while stack:
+                item = stack.pop()
+                if isinstance(item, str):
+                    out.write(item)
+                else:
+                    stack.extend(reversed(item.accept(self)))
+
+    def write_json(self, nodes: list[Stmt] | list[Node], out: TextIO) -> None:
+        stack: list[tuple[int, str | None, int | None, Node]] = [
+            (0, None, None, node) for node in reversed(nodes)
+        ]
+        while stack:
+            depth, field, index, node = stack.pop()
+
+            record: dict[str, Any] = {"depth": depth, "node": type(node).__name__}
+            if field is not None:
+                record["field"] = field
+            if index is not None:
+                record["index"] = index
+
+            children: list[tuple[int, str, int | None, Expr | Stmt]] = []
+            for name, value in AstPrinter.fields(node):
+                if isinstance(value, (Expr, Stmt)):
+                    children.append((depth + 1, name, None, value))
+                elif isinstance(value, list):
+                    for position, element in enumerate(value):
+                        children.append((depth + 1, name, position, element))
+                elif isinstance(value, Token):
+                    record[name] = value.lexeme
+                elif value is None or isinstance(value, (str, float, int)):
+                    record[name] = value
+
+            out.write(json.dumps(record))
+            out.write("\n")
+            stack.extend(reversed(children))
+
+    @staticmethod
+    def fields(node: Node) -> Iterator[tuple[str, Any]]:
+        if isinstance(node, Block):
+            yield "line", node.line
+            yield "statements", node.statements
+            return
+
+        if isinstance(node, Stmt):
+            yield "line", node.line
+        for name in AstPrinter.parameters(type(node)):
+            yield name, getattr(node, name)
+
+    @staticmethod
+    @functools.cache
+    def parameters(node_type: type[Node]) -> list[str]:
+        return list(inspect.signature(node_type.__init__).parameters)[1:]
+
+    def parenthesize(self, name: str, *parts: Any) -> list[Any]:
+        layout: list[Any] = ["(" + name]
+        for part in parts:
+            if isinstance(part, list):
+                for element in part:
+                    layout += [" ", element]
+            elif part is not None:
+                layout += [" ", part]
+        layout.append(")")
+
+        return layout
+
+    def literal(self, value: Any) -> str:
+        if value is None:
+            return "nil"
+        if isinstance(value, bool):
+            return "true" if value else "false"
+        if isinstance(value, float) and value.is_integer():
+            return str(int(value))
+        if isinstance(value, str):
+            return f'"{value}"'
+        return str(value)
+
+    def visit_block_stmt(self, stmt: Block) -> list[Any]:
+        return self.parenthesize("block", stmt.statements)
+
+    def visit_expression_stmt(self, stmt: Expression) -> list[Any]:
+        return self.parenthesize(";", stmt.expression)
+
+    def visit_if_stmt(self, stmt: If) -> list[Any]:
+        return self.parenthesize(
+            "if", stmt.condition, stmt.then_branch, stmt.else_branch
         )
 
-        print(AstPrinter().print(expression))
+    def visit_import_stmt(self, stmt: Import) -> list[Any]:
+        return self.parenthesize("import", stmt.path.lexeme)
+
+    def visit_print_stmt(self, stmt: Print) -> list[Any]:
+        return self.parenthesize("print", stmt.expression)
 
-    def print(self, expr: Expr) -> Any:
-        return expr.accept(self)
+    def visit_var_stmt(self, stmt: Var) -> list[Any]:
+        return self.parenthesize("var", stmt.name.lexeme, stmt.initializer)
 
-    def parenthesize(self, name: str, *exprs: Expr) -> str:
-        builder = "(" + name
-        for expr in exprs:
-            builder += " "
-            builder += expr.accept(self)
-        builder += ")"
+    def visit_while_stmt(self, stmt: While) -> list[Any]:
+        return self.parenthesize("while", stmt.condition, stmt.body)
 
-        return builder
+    def visit_assign_expr(self, expr: Assign) -> list[Any]:
+        return self.parenthesize("=", expr.name.lexeme, expr.value)
 
-    def visit_binary_expr(self, expr: Binary) -> str:
+    def visit_binary_expr(self, expr: Binary) -> list[Any]:
         return self.parenthesize(expr.operator.lexeme, expr.left, expr.right)
 
-    def visit_grouping_expr(self, expr: Grouping) -> str:
+    def visit_call_expr(self, expr: Call) -> list[Any]:
+        return self.parenthesize("call", expr.callee, expr.arguments)
+
+    def visit_grouping_expr(self, expr: Grouping) -> list[Any]:
         return self.parenthesize("group", expr.expression)
 
-    def visit_literal_expr(self, expr: Literal) -> str:
-        if expr.value is None:
-            return "nil"
-        return str(expr.value)
+    def visit_index_expr(self, expr: Index) -> list[Any]:
+        return self.parenthesize("index", expr.object, expr.index)
+
+    def visit_list_literal_expr(self, expr: ListLiteral) -> list[Any]:
+        return self.parenthesize("list", expr.elements)
 
-    def visit_unary_expr(self, expr: Unary) -> str:
+    def visit_literal_expr(self, expr: Literal) -> list[Any]:
+        return [self.literal(expr.value)]
+
+    def visit_logical_expr(self, expr: Logical) -> list[Any]:
+        return self.parenthesize(expr.operator.lexeme, expr.left, expr.right)
+
+    def visit_map_literal_expr(self, expr: MapLiteral) -> list[Any]:
+        entries = [part for entry in zip(expr.keys, expr.values) for part in entry]
+        return self.parenthesize("map", entries)
+
+    def visit_set_index_expr(self, expr: SetIndex) -> list[Any]:
+        return self.parenthesize("set-index", expr.object, expr.index, expr.value)
+
+    def visit_unary_expr(self, expr: Unary) -> list[Any]:
         return self.parenthesize(expr.operator.lexeme, expr.right)
 
+    def visit_variable_expr(self, expr: Variable) -> list[Any]:
+        return [expr.name.lexeme]
+
 
 if __name__ == "__main__":
     AstPrinter.main()
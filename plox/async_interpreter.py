@@ -0,0 +1,82 @@
+import asyncio
+import time
+
+from environment import Environment
+from errors import LazyParseError, LoxRuntimeError
+from interpreter import Interpreter
+from lox import Lox
+from stmt import Block, If, Stmt, While
+from tokens import Token, TokenType
+
+
+class AsyncInterpreter(Interpreter):
+    def __init__(
+        self,
+        yield_every: int = 1000,
+        budget: int | None = None,
+        deadline: float | None = None,
+        directory: str | None = None,
+    ) -> None:
+        super().__init__(directory)
+        self.yield_every = yield_every
+        self.budget = budget
+        self.deadline = deadline
+
+        self.steps = 0
+        self.until_yield = yield_every
+        self.expires_at: float | None = None
+
+    async def interpret_async(self, statements: list[Stmt]) -> None:
+        if self.deadline is not None:
+            self.expires_at = time.monotonic() + self.deadline
+
+        try:
+            for statement in statements:
+                await self.execute_async(statement)
+        except LoxRuntimeError as error:
+            Lox.runtime_error(error)
+        except LazyParseError:
+            pass
+
+    async def execute_async(self, stmt: Stmt) -> None:
+        self.steps += 1
+        if self.budget is not None and self.steps > self.budget:
+            raise LoxRuntimeError(self.token_at(stmt), "instruction budget exceeded")
+
+        self.until_yield -= 1
+        if self.until_yield <= 0:
+            self.until_yield = self.yield_every
+            if self.expires_at is not None and time.monotonic() > self.expires_at:
+                raise LoxRuntimeError(self.token_at(stmt), "deadline exceeded")
+            await asyncio.sleep(0)
+
+        match stmt:
+            case Block():
+                environment = Environment.acquire(self.environment)
+                await self.execute_block_async(stmt.statements, environment)
+                Environment.release(environment)
+            case If():
+                if self.is_truthy(self.evaluate(stmt.condition)):
+                    await self.execute_async(stmt.then_branch)
+                elif stmt.else_branch:
+                    await self.execute_async(stmt.else_branch)
+            case While():
+                while self.is_truthy(self.evaluate(stmt.condition)):
+                    await self.execute_async(stmt.body)
+            case _:
+                self.execute(stmt)
+
+    async def execute_block_async(
+        self, statements: list[Stmt], environment: Environment
+    ) -> None:
+        previous = self.environment
+        try:
+            self.environment = environment
+
+            for statement in statements:
+                await self.execute_async(statement)
+        finally:
+            self.environment = previous
+
+    def token_at(self, stmt: Stmt) -> Token:
+        return Token(TokenType.EOF, "", None, stmt.line)
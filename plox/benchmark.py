@@ -0,0 +1,581 @@
+import contextlib
+import io
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Iterator
+
+from expr import Expr
+from lox import Lox
+from stmt import Stmt
+
+
+class Benchmark:
+    @staticmethod
+    def main() -> None:
+        benchmarks: dict[str, Callable[[], None]] = {
+            "lookup": Benchmark.lookup,
+            "batch": Benchmark.batch,
+            "daemon": Benchmark.daemon,
+            "hooks": Benchmark.hooks,
+            "lazy": Benchmark.lazy,
+            "incremental": Benchmark.incremental,
+            "parallel": Benchmark.parallel,
+            "mmap": Benchmark.mmap,
+            "snapshot": Benchmark.snapshot,
+            "pmap": Benchmark.pmap,
+            "files": Benchmark.files,
+            "globals": Benchmark.globals,
+            "tiers": Benchmark.tiers,
+            "scopes": Benchmark.scopes,
+        }
+
+        args = sys.argv[1:]
+        if any(name not in benchmarks for name in args):
+            print(f"Usage: benchmark [{' | '.join(benchmarks)}]...")
+            exit(64)
+
+        for name in args or benchmarks:
+            benchmarks[name]()
+
+    @staticmethod
+    def time_run(source: str) -> float:
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            Lox.run(source)
+        return time.perf_counter() - start
+
+    @staticmethod
+    def lookup(keys: int = 100, lookups: int = 20000) -> None:
+        names = ", ".join(f'"key{i}"' for i in range(keys))
+        entries = ", ".join(f'"key{i}": {i}' for i in range(keys))
+        chain = " else ".join(f'if (key == "key{i}") value = {i};' for i in range(keys))
+
+        loop = """
+            var names = [{names}];
+            var total = 0;
+            var i = 0;
+            var j = 0;
+            while (i < {lookups}) {{
+                var key = names[j];
+                {lookup}
+                total = total + value;
+                i = i + 1;
+                j = j + 1;
+                if (j == {keys}) j = 0;
+            }}
+            print total;
+        """
+
+        sources = {
+            "map": f"var table = {{{entries}}};"
+            + loop.format(
+                names=names,
+                lookups=lookups,
+                keys=keys,
+                lookup="var value = table[key];",
+            ),
+            "if-chain": loop.format(
+                names=names,
+                lookups=lookups,
+                keys=keys,
+                lookup=f"var value = nil; {chain}",
+            ),
+        }
+
+        for name, source in sources.items():
+            elapsed = Benchmark.time_run(source)
+            print(f"lookup/{name}: {lookups / elapsed:,.0f} lookups/s ({keys} keys)")
+
+    @staticmethod
+    def batch(records: int = 20000) -> None:
+        rule = 'price * quantity > 100 and region == "eu"'
+        rows = [
+            {"price": float(i % 50), "quantity": float(i % 7), "region": "eu"}
+            for i in range(records)
+        ]
+
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for row in rows:
+                Lox.run(
+                    f"var price = {row['price']}; var quantity = {row['quantity']};"
+                    f' var region = "{row["region"]}"; print {rule};'
+                )
+        per_run = (time.perf_counter() - start) / records
+
+        from program import Program
+
+        start = time.perf_counter()
+        Program(rule).evaluate_batch(rows)
+        per_record = (time.perf_counter() - start) / records
+
+        print(f"batch/run: {per_run * 1e6:.1f} us/record")
+        print(f"batch/program: {per_record * 1e6:.1f} us/record")
+
+    @staticmethod
+    def daemon(runs: int = 50) -> None:
+        directory = os.path.dirname(os.path.abspath(__file__))
+
+        with tempfile.TemporaryDirectory() as temporary:
+            script = os.path.join(temporary, "script.lox")
+            with open(script, "w") as file:
+                file.write('var greeting = "hello"; print greeting;')
+
+            environment = dict(os.environ, PLOX_SOCKET=f"{temporary}/plox.sock")
+            daemon = subprocess.Popen(
+                [sys.executable, os.path.join(directory, "daemon.py")],
+                env=environment,
+            )
+            try:
+                while not os.path.exists(environment["PLOX_SOCKET"]):
+                    time.sleep(0.01)
+
+                commands = {
+                    "cold": [sys.executable, os.path.join(directory, "lox.py"), script],
+                    "daemon": [
+                        sys.executable,
+                        "-S",
+                        os.path.join(directory, "daemon_client.py"),
+                        script,
+                    ],
+                }
+                for name, command in commands.items():
+                    timings = []
+                    for _ in range(runs):
+                        start = time.perf_counter()
+                        subprocess.run(
+                            command, env=environment, stdout=subprocess.DEVNULL
+                        )
+                        timings.append((time.perf_counter() - start) * 1000)
+
+                    percentiles = statistics.quantiles(timings, n=100)
+                    print(
+                        f"daemon/{name}: p50 {percentiles[49]:.1f} ms,"
+                        f" p90 {percentiles[89]:.1f} ms,"
+                        f" p99 {percentiles[98]:.1f} ms"
+                    )
+            finally:
+                daemon.terminate()
+                daemon.wait()
+
+    @staticmethod
+    def hooks(iterations: int = 50000, repeats: int = 5) -> None:
+        from interpreter import Interpreter
+        from stmt import Stmt
+
+        statements = Lox.parse(f"""
+            var total = 0;
+            var i = 0;
+            while (i < {iterations}) {{
+                if (i > 10) total = total + i; else total = total - i;
+                i = i + 1;
+            }}
+            """)
+
+        def noop(event: str, stmt: Stmt, environment: Any, arg: Any) -> None:
+            pass
+
+        def plain() -> Interpreter:
+            return Interpreter()
+
+        def removed() -> Interpreter:
+            interpreter = Interpreter()
+            interpreter.add_hook(noop)
+            interpreter.remove_hook(noop)
+            return interpreter
+
+        def hooked() -> Interpreter:
+            interpreter = Interpreter()
+            interpreter.add_hook(noop)
+            return interpreter
+
+        for name, factory in (("none", plain), ("removed", removed), ("noop", hooked)):
+            best = float("inf")
+            for _ in range(repeats):
+                interpreter = factory()
+                start = time.perf_counter()
+                interpreter.interpret(statements)
+                best = min(best, time.perf_counter() - start)
+            print(f"hooks/{name}: {best * 1000:.1f} ms")
+
+    @staticmethod
+    def lazy(branches: int = 2000, repeats: int = 5) -> None:
+        body = """
+                var total = 0;
+                var i = 0;
+                while (i < 10) {{
+                    total = total + i * {branch};
+                    i = i + 1;
+                }}
+                print [total, {{"branch": {branch}}}];
+        """
+        source = "var hot = 7;\n" + "".join(
+            f"if (hot == {branch}) {{{body.format(branch=branch)}}}\n"
+            for branch in range(branches)
+        )
+
+        for name, lazy in (("eager", False), ("lazy", True)):
+            Lox.lazy = lazy
+            best = float("inf")
+            for _ in range(repeats):
+                start = time.perf_counter()
+                Lox.parse(source)
+                best = min(best, time.perf_counter() - start)
+
+            tracemalloc.start()
+            statements = Lox.parse(source)
+            retained, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            del statements
+
+            print(
+                f"lazy/{name}: parse {best * 1000:.1f} ms,"
+                f" peak {peak / 1024:,.0f} KiB, retained {retained / 1024:,.0f} KiB"
+            )
+
+        Lox.lazy = False
+
+    @staticmethod
+    def incremental(declarations: int = 5000, repeats: int = 3) -> None:
+        from incremental import Document
+
+        source = "".join(
+            f"var v{i} = {i};\nif (v{i} > 10) {{ print v{i} * 2; }}\n"
+            for i in range(declarations)
+        )
+        middle = source.index(f"var v{declarations // 2} ")
+
+        edits = {
+            "full": None,
+            "same-line": (middle, middle, "print 1; "),
+            "new-line": (middle, middle, "print 1;\n"),
+        }
+        for name, edit in edits.items():
+            best = float("inf")
+            for _ in range(repeats):
+                document = Document(source)
+                start = time.perf_counter()
+                if edit is None:
+                    Document(source)
+                else:
+                    document.edit(*edit)
+                best = min(best, time.perf_counter() - start)
+            print(f"incremental/{name}: {best * 1000:.1f} ms")
+
+    @staticmethod
+    def parallel(declarations: int = 10000) -> None:
+        from parallel import ParallelParser
+
+        source = "".join(
+            f"var v{i} = {i} * 2;\n"
+            f'if (v{i} > 3) {{ print [v{i}, {{"k": v{i}}}]; }} else print -v{i};\n'
+            f'while (v{i} > 100) v{i} = v{i} / 2;\nprint "{i};\n";\n'
+            for i in range(declarations)
+        )
+
+        start = time.perf_counter()
+        Lox.parse(source)
+        sequential = time.perf_counter() - start
+        print(f"parallel/sequential: {sequential * 1000:.0f} ms")
+
+        threshold = ParallelParser.threshold
+        ParallelParser.threshold = 0
+        try:
+            cores = os.cpu_count() or 1
+            for jobs in sorted({2, 4, max(cores, 2)}):
+                Lox.jobs = jobs
+                start = time.perf_counter()
+                Lox.parse(source)
+                elapsed = time.perf_counter() - start
+                print(
+                    f"parallel/jobs={jobs}: {elapsed * 1000:.0f} ms,"
+                    f" {sequential / elapsed:.2f}x on {cores} cores"
+                )
+        finally:
+            Lox.jobs = 1
+            ParallelParser.threshold = threshold
+
+    @staticmethod
+    def mmap(declarations: int = 50000) -> None:
+        directory = os.path.dirname(os.path.abspath(__file__))
+
+        with tempfile.TemporaryDirectory() as temporary:
+            script = os.path.join(temporary, "script.lox")
+            with open(script, "w") as file:
+                for i in range(declarations):
+                    file.write(
+                        f'var v{i} = "value {i}";\n'
+                        f"if (v{i} == nil) {{ print [v{i}, {i}.5]; }}\n"
+                    )
+            size = os.path.getsize(script)
+
+            for name, flags in (("str", []), ("mmap", ["--mmap"])):
+                start = time.perf_counter()
+                process = subprocess.Popen(
+                    [sys.executable, os.path.join(directory, "lox.py"), *flags, script]
+                )
+                _, status, usage = os.wait4(process.pid, 0)
+                process.returncode = os.waitstatus_to_exitcode(status)
+                elapsed = time.perf_counter() - start
+                print(
+                    f"mmap/{name}: {elapsed * 1000:.0f} ms,"
+                    f" peak RSS {usage.ru_maxrss / 1024:,.0f} MiB"
+                    f" for {size / (1 << 20):,.0f} MiB of source"
+                )
+
+    @staticmethod
+    def snapshot(entries: int = 20000) -> None:
+        directory = os.path.dirname(os.path.abspath(__file__))
+
+        with tempfile.TemporaryDirectory() as temporary:
+            script = os.path.join(temporary, "script.lox")
+            image = os.path.join(temporary, "script.snapshot")
+            with open(script, "w") as file:
+                file.write(
+                    "var table = {};\nvar i = 0;\n"
+                    f"while (i < {entries}) {{\n"
+                    '  table[i] = [i * i, "entry"];\n  i = i + 1;\n}\n'
+                    "snapshot();\nprint len(table);\n"
+                )
+
+            for name, flags in (
+                ("cold", []),
+                ("save", ["--snapshot-save", image]),
+                ("load", ["--snapshot-load", image]),
+            ):
+                start = time.perf_counter()
+                subprocess.run(
+                    [sys.executable, os.path.join(directory, "lox.py"), *flags, script],
+                    stdout=subprocess.DEVNULL,
+                    check=True,
+                )
+                elapsed = time.perf_counter() - start
+                print(f"snapshot/{name}: {elapsed * 1000:.0f} ms")
+
+            print(f"snapshot/image: {os.path.getsize(image):,} bytes")
+
+    @staticmethod
+    def pmap(inputs: int = 32, iterations: int = 5000) -> None:
+        from module_loader import ModuleLoader
+        from program import Program
+
+        worker = (
+            "var total = 0;\nvar i = 0;\n"
+            f"while (i < {iterations}) {{ total = total + i * input; i = i + 1; }}\n"
+            "total;\n"
+        )
+
+        start = time.perf_counter()
+        program = Program(worker)
+        for n in range(inputs):
+            program.evaluate({"input": n})
+        sequential = time.perf_counter() - start
+        print(f"pmap/sequential: {sequential * 1000:.0f} ms")
+
+        with tempfile.TemporaryDirectory() as temporary:
+            with open(os.path.join(temporary, "worker.lox"), "w") as file:
+                file.write(worker)
+
+            search_path = ModuleLoader.search_path
+            ModuleLoader.search_path = [temporary]
+            try:
+                elapsed = Benchmark.time_run(
+                    "var inputs = [];\nvar n = 0;\n"
+                    f"while (n < {inputs}) {{ append(inputs, n); n = n + 1; }}\n"
+                    'print pmap("worker.lox", inputs);\n'
+                )
+            finally:
+                ModuleLoader.search_path = search_path
+
+        cores = os.cpu_count() or 1
+        print(
+            f"pmap/parallel: {elapsed * 1000:.0f} ms,"
+            f" {sequential / elapsed:.2f}x on {cores} cores"
+        )
+
+    @staticmethod
+    def files(megabytes: int = 1024) -> None:
+        directory = os.path.dirname(os.path.abspath(__file__))
+
+        with tempfile.TemporaryDirectory() as temporary:
+            data = os.path.join(temporary, "data.txt")
+            line = "0123456789,abcdefghijklmnopqrstuvwxyz,0123456789\n"
+            block = line * ((1 << 20) // len(line))
+            with open(data, "w") as file:
+                for _ in range(megabytes):
+                    file.write(block)
+            size = os.path.getsize(data)
+
+            start = time.perf_counter()
+            with open(data) as file:
+                for _ in file:
+                    pass
+            elapsed = time.perf_counter() - start
+            print(f"files/python: {size / (1 << 20) / elapsed:,.0f} MiB/s")
+
+            for name, loop in (
+                (
+                    "readline",
+                    "var line;\nvar n = 0;\n"
+                    "while ((line = readline(f)) != nil) n = n + len(line);\n",
+                ),
+                (
+                    "read",
+                    "var chunk;\nvar n = 0;\n"
+                    "while ((chunk = read(f, 65536)) != nil) n = n + len(chunk);\n",
+                ),
+                (
+                    "copy",
+                    'var out = open("copy.txt", "w");\nvar line;\n'
+                    "while ((line = readline(f)) != nil) writeline(out, line);\n"
+                    "close(out);\n",
+                ),
+            ):
+                script = os.path.join(temporary, f"{name}.lox")
+                with open(script, "w") as file:
+                    file.write(f'var f = open("data.txt", "r");\n{loop}close(f);\n')
+
+                start = time.perf_counter()
+                process = subprocess.Popen(
+                    [sys.executable, os.path.join(directory, "lox.py"), script],
+                    cwd=temporary,
+                )
+                _, status, usage = os.wait4(process.pid, 0)
+                process.returncode = os.waitstatus_to_exitcode(status)
+                elapsed = time.perf_counter() - start
+                print(
+                    f"files/{name}: {size / (1 << 20) / elapsed:,.1f} MiB/s,"
+                    f" peak RSS {usage.ru_maxrss / 1024:,.0f} MiB"
+                    f" for {size / (1 << 20):,.0f} MiB of input"
+                )
+
+    @staticmethod
+    def globals(iterations: int = 50000) -> None:
+        from interpreter import Interpreter
+
+        source = f"""
+            var total = 0;
+            var step = 3;
+            var i = 0;
+            while (i < {iterations}) {{
+                {{
+                    {{
+                        total = total + step * i;
+                        i = i + 1;
+                    }}
+                }}
+            }}
+            print total;
+        """
+
+        statements = Lox.parse(source)
+        for name in ("cached", "uncached"):
+            if name == "uncached":
+                for expr in Benchmark.walk(statements):
+                    expr.cache = None
+
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                Interpreter().interpret(statements)
+            elapsed = time.perf_counter() - start
+            print(f"globals/{name}: {iterations / elapsed:,.0f} iterations/s")
+
+        statements = Lox.parse(source)
+        interpreter = Interpreter()
+        stats = interpreter.enable_stats()
+        with contextlib.redirect_stdout(io.StringIO()):
+            interpreter.interpret(statements)
+        print(
+            f"globals/cache: {stats.cache_hits:,} hits, {stats.cache_misses:,} misses"
+        )
+
+    @staticmethod
+    def tiers(iterations: int = 100000) -> None:
+        source = f"""
+            var total = 0;
+            var squares = [];
+            var i = 0;
+            while (i < {iterations}) {{
+                var square = i * i;
+                if (square > total / 2) {{
+                    total = total + square;
+                }} else {{
+                    total = total - i;
+                }}
+                if (i < 100) append(squares, square);
+                i = i + 1;
+            }}
+            print total;
+        """
+
+        threshold = Lox.tier_threshold
+        try:
+            for name, tier_threshold in (("interpreted", None), ("tiered", threshold)):
+                Lox.tier_threshold = tier_threshold
+                elapsed = Benchmark.time_run(source)
+                print(f"tiers/{name}: {iterations / elapsed:,.0f} iterations/s")
+        finally:
+            Lox.tier_threshold = threshold
+
+    @staticmethod
+    def scopes(iterations: int = 50000) -> None:
+        from environment import Environment
+
+        source = f"""
+            var total = 0;
+            var i = 0;
+            while (i < {iterations}) {{
+                {{
+                    var square = i * i;
+                    {{
+                        {{
+                            total = total + square;
+                        }}
+                    }}
+                }}
+                i = i + 1;
+            }}
+            print total;
+        """
+
+        pool_size = Environment.pool_size
+        threshold = Lox.tier_threshold
+        try:
+            Lox.tier_threshold = None
+            for name, size in (("unpooled", 0), ("pooled", pool_size)):
+                Environment.pool_size = size
+                Environment.pool.clear()
+
+                allocations = Environment.allocations
+                elapsed = Benchmark.time_run(source)
+                allocations = Environment.allocations - allocations
+
+                print(
+                    f"scopes/{name}: {iterations / elapsed:,.0f} iterations/s,"
+                    f" {allocations:,} environments allocated"
+                )
+        finally:
+            Environment.pool_size = pool_size
+            Lox.tier_threshold = threshold
+
+    @staticmethod
+    def walk(statements: list[Stmt]) -> Iterator[Expr]:
+        stack: list[Any] = list(statements)
+        while stack:
+            node = stack.pop()
+            if isinstance(node, Expr):
+                yield node
+            for value in vars(node).values():
+                if isinstance(value, (Expr, Stmt)):
+                    stack.append(value)
+                elif isinstance(value, list):
+                    stack += value
+
+
+if __name__ == "__main__":
+    Benchmark.main()
@@ -0,0 +1,91 @@
+import mmap
+import os
+import re
+import sys
+from typing import Any
+
+from scanner import Scanner
+from tokens import Token, TokenType
+
+
+class ByteScanner:
+    threshold = 16 << 20
+
+    pattern = re.compile(
+        rb"(?P<space>[ \t\n]+)"
+        rb"|(?P<number>[0-9]+(?:\.[0-9]+)?)"
+        rb"|(?P<identifier>[A-Za-z][A-Za-z0-9_]*)"
+        rb'|(?P<string>"[^"]*")'
+        rb"|(?P<operator>[!=<>]=|[(){}\[\]:,.\-+;/*!=<>])"
+    )
+
+    operators = {
+        type.value.encode(): (type, type.value)
+        for type in TokenType
+        if not type.value.isalpha()
+    }
+    keywords = {
+        keyword: (TokenType(keyword), sys.intern(keyword))
+        for keyword in Scanner.keywords
+    }
+
+    def __init__(self, data: Any) -> None:
+        self.data = data
+        self.tokens: list[Token] = []
+
+    def scan_tokens(self) -> list[Token] | None:
+        if self.data.find(b"\r") != -1:
+            return None
+
+        tokens = self.tokens
+        operators = ByteScanner.operators
+        keywords = ByteScanner.keywords
+        identifiers: dict[bytes, str] = {}
+
+        line = 0
+        position = 0
+        for match in ByteScanner.pattern.finditer(self.data):
+            if match.start() != position:
+                return None
+            position = match.end()
+
+            kind = match.lastgroup
+            text = match.group()
+            if kind == "space":
+                line += text.count(b"\n")
+            elif kind == "operator":
+                type, lexeme = operators[text]
+                tokens.append(Token(type, lexeme, None, line))
+            elif kind == "identifier":
+                name = identifiers.get(text)
+                if name is None:
+                    name = identifiers[text] = sys.intern(text.decode())
+                if name in keywords:
+                    type, lexeme = keywords[name]
+                    tokens.append(Token(type, lexeme, None, line))
+                else:
+                    tokens.append(Token(TokenType.IDENTIFIER, name, None, line))
+            elif kind == "number":
+                tokens.append(Token(TokenType.NUMBER, text.decode(), float(text), line))
+            else:
+                try:
+                    lexeme = text.decode()
+                except UnicodeDecodeError:
+                    return None
+                line += text.count(b"\n")
+                tokens.append(Token(TokenType.STRING, lexeme, lexeme[1:-1], line))
+
+        if position != len(self.data):
+            return None
+
+        tokens.append(Token(TokenType.EOF, "", None, line))
+        return tokens
+
+    @staticmethod
+    def scan_file(path: str) -> list[Token] | None:
+        with open(path, "rb") as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return ByteScanner(b"").scan_tokens()
+
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return ByteScanner(data).scan_tokens()
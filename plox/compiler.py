@@ -0,0 +1,347 @@
+from __future__ import annotations
+from typing import Any, Callable, TYPE_CHECKING
+
+from environment import Environment
+from errors import CompileError, LoxRuntimeError
+from expr import (
+    Assign,
+    Binary,
+    Call,
+    Expr,
+    ExprVisitor,
+    Grouping,
+    Index,
+    ListLiteral,
+    Literal,
+    Logical,
+    MapLiteral,
+    SetIndex,
+    Unary,
+    Variable,
+)
+from lazy_parser import LazyBlock
+from lox_callable import LoxCallable
+from lox_list import LoxList
+from lox_map import LoxMap
+from stmt import Block, Expression, If, Import, Print, Stmt, StmtVisitor, Var, While
+from tokens import TokenType
+
+if TYPE_CHECKING:
+    from interpreter import Interpreter
+
+Code = Callable[[], Any]
+
+
+class Compiler(ExprVisitor, StmtVisitor):
+    def __init__(self, interpreter: Interpreter) -> None:
+        self.interpreter = interpreter
+
+    def compile_loop(self, stmt: While) -> Code | None:
+        try:
+            return self.compile(stmt)
+        except CompileError:
+            return None
+
+    def compile(self, node: Expr | Stmt) -> Code:
+        if "accept" in vars(node):
+            raise CompileError("node is instrumented")
+
+        code: Code = node.accept(self)
+        return code
+
+    def visit_block_stmt(self, stmt: Block) -> Code:
+        if isinstance(stmt, LazyBlock) and stmt.parsed is None:
+            raise CompileError("block is not parsed yet")
+
+        interpreter = self.interpreter
+        statements = [self.compile(statement) for statement in stmt.statements]
+
+        def block() -> None:
+            previous = interpreter.environment
+            environment = interpreter.environment = Environment.acquire(previous)
+            try:
+                for statement in statements:
+                    statement()
+            finally:
+                interpreter.environment = previous
+
+            Environment.release(environment)
+
+        return block
+
+    def visit_expression_stmt(self, stmt: Expression) -> Code:
+        return self.compile(stmt.expression)
+
+    def visit_if_stmt(self, stmt: If) -> Code:
+        condition = self.compile(stmt.condition)
+        then_branch = self.compile(stmt.then_branch)
+        if stmt.else_branch is None:
+
+            def if_then() -> None:
+                value = condition()
+                if value is not None and value is not False:
+                    then_branch()
+
+            return if_then
+
+        else_branch = self.compile(stmt.else_branch)
+
+        def if_else() -> None:
+            value = condition()
+            if value is not None and value is not False:
+                then_branch()
+            else:
+                else_branch()
+
+        return if_else
+
+    def visit_import_stmt(self, stmt: Import) -> Code:
+        interpreter = self.interpreter
+        return lambda: interpreter.visit_import_stmt(stmt)
+
+    def visit_print_stmt(self, stmt: Print) -> Code:
+        expression = self.compile(stmt.expression)
+        stringify = self.interpreter.stringify
+        return lambda: print(stringify(expression()))
+
+    def visit_var_stmt(self, stmt: Var) -> Code:
+        interpreter = self.interpreter
+        name = stmt.name.lexeme
+        initializer = (
+            self.compile(stmt.initializer)
+            if stmt.initializer is not None
+            else lambda: None
+        )
+        return lambda: interpreter.environment.define(name, initializer())
+
+    def visit_while_stmt(self, stmt: While) -> Code:
+        condition = self.compile(stmt.condition)
+        body = self.compile(stmt.body)
+
+        def loop() -> None:
+            while True:
+                value = condition()
+                if value is None or value is False:
+                    break
+                body()
+
+        return loop
+
+    def visit_assign_expr(self, expr: Assign) -> Code:
+        interpreter = self.interpreter
+        name = expr.name
+        value = self.compile(expr.value)
+
+        cache = expr.cache
+        if cache is None:
+
+            def assign() -> Any:
+                result = value()
+                interpreter.environment.assign(name, result)
+                return result
+
+            return assign
+
+        globals = interpreter.globals
+        values = globals.values
+        lexeme = name.lexeme
+
+        def assign_global() -> Any:
+            result = value()
+            if cache.version == globals.version:
+                cache.cell.value = result
+            else:
+                globals.lookup(name, cache).value = result
+            values[lexeme] = result
+            return result
+
+        return assign_global
+
+    def visit_binary_expr(self, expr: Binary) -> Code:
+        left = self.compile(expr.left)
+        right = self.compile(expr.right)
+        operator = expr.operator
+
+        operators = self.interpreter.unchecked_operators
+        if expr.unchecked:
+            function = operators[operator.type]
+            return lambda: function(left(), right())
+
+        match operator.type:
+            case TokenType.PLUS:
+
+                def add() -> Any:
+                    a = left()
+                    b = right()
+                    if isinstance(a, float) and isinstance(b, float):
+                        return a + b
+                    if isinstance(a, str) and isinstance(b, str):
+                        return a + b
+                    raise LoxRuntimeError(
+                        operator, "operands must be two numbers or two strings"
+                    )
+
+                return add
+            case TokenType.BANG_EQUAL:
+                return lambda: not bool(left() == right())
+            case TokenType.EQUAL_EQUAL:
+                return lambda: bool(left() == right())
+
+        function = operators[operator.type]
+
+        def arithmetic() -> Any:
+            a = left()
+            b = right()
+            if isinstance(a, float) and isinstance(b, float):
+                return function(a, b)
+            raise LoxRuntimeError(operator, "operands must be a number")
+
+        return arithmetic
+
+    def visit_call_expr(self, expr: Call) -> Code:
+        interpreter = self.interpreter
+        callee = self.compile(expr.callee)
+        arguments = [self.compile(argument) for argument in expr.arguments]
+        paren = expr.paren
+
+        def call() -> Any:
+            function = callee()
+            values = [argument() for argument in arguments]
+
+            if not isinstance(function, LoxCallable):
+                raise LoxRuntimeError(paren, "can only call functions")
+
+            if len(values) != function.arity():
+                raise LoxRuntimeError(
+                    paren,
+                    f"expected {function.arity()} arguments but got {len(values)}",
+                )
+
+            return function.call(interpreter, values, paren)
+
+        return call
+
+    def visit_grouping_expr(self, expr: Grouping) -> Code:
+        return self.compile(expr.expression)
+
+    def visit_index_expr(self, expr: Index) -> Code:
+        object = self.compile(expr.object)
+        index = self.compile(expr.index)
+        bracket = expr.bracket
+
+        def get() -> Any:
+            container = object()
+            key = index()
+
+            if isinstance(container, (LoxList, LoxMap)):
+                return container.get(bracket, key)
+
+            raise LoxRuntimeError(bracket, "only lists and maps can be indexed")
+
+        return get
+
+    def visit_list_literal_expr(self, expr: ListLiteral) -> Code:
+        elements = [self.compile(element) for element in expr.elements]
+        return lambda: LoxList([element() for element in elements])
+
+    def visit_literal_expr(self, expr: Literal) -> Code:
+        value = expr.value
+        return lambda: value
+
+    def visit_logical_expr(self, expr: Logical) -> Code:
+        left = self.compile(expr.left)
+        right = self.compile(expr.right)
+
+        if expr.operator.type == TokenType.OR:
+
+            def logical_or() -> Any:
+                value = left()
+                if value is not None and value is not False:
+                    return value
+                return right()
+
+            return logical_or
+
+        def logical_and() -> Any:
+            value = left()
+            if value is not None and value is not False:
+                return right()
+            return value
+
+        return logical_and
+
+    def visit_map_literal_expr(self, expr: MapLiteral) -> Code:
+        entries = [
+            (self.compile(key), self.compile(value))
+            for key, value in zip(expr.keys, expr.values)
+        ]
+
+        def map_literal() -> Any:
+            result = {}
+            for key, value in entries:
+                result[key()] = value()
+            return LoxMap(result)
+
+        return map_literal
+
+    def visit_set_index_expr(self, expr: SetIndex) -> Code:
+        object = self.compile(expr.object)
+        index = self.compile(expr.index)
+        value = self.compile(expr.value)
+        bracket = expr.bracket
+
+        def set_index() -> Any:
+            container = object()
+            key = index()
+            result = value()
+
+            if isinstance(container, LoxList):
+                container.set(bracket, key, result)
+            elif isinstance(container, LoxMap):
+                container.set(key, result)
+            else:
+                raise LoxRuntimeError(bracket, "only lists and maps can be indexed")
+
+            return result
+
+        return set_index
+
+    def visit_unary_expr(self, expr: Unary) -> Code:
+        right = self.compile(expr.right)
+        operator = expr.operator
+
+        if expr.unchecked:
+            return lambda: -right()
+
+        if operator.type == TokenType.BANG:
+
+            def logical_not() -> Any:
+                value = right()
+                return value is None or value is False
+
+            return logical_not
+
+        def negate() -> Any:
+            value = right()
+            if isinstance(value, float):
+                return -value
+            raise LoxRuntimeError(operator, "operand must be a number")
+
+        return negate
+
+    def visit_variable_expr(self, expr: Variable) -> Code:
+        interpreter = self.interpreter
+        name = expr.name
+
+        cache = expr.cache
+        if cache is None:
+            return lambda: interpreter.environment.get(name)
+
+        globals = interpreter.globals
+
+        def variable() -> Any:
+            if cache.version == globals.version:
+                return cache.cell.value
+            return globals.lookup(name, cache).value
+
+        return variable
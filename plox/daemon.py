@@ -0,0 +1,129 @@
+import argparse
+import importlib
+import json
+import os
+import signal
+import socket
+import struct
+import sys
+import traceback
+
+from daemon_client import DaemonClient
+from lox import Lox
+from tokens import Token, TokenType
+
+
+class Daemon:
+    @staticmethod
+    def main() -> None:
+        argument_parser = argparse.ArgumentParser(prog="plox-daemon")
+        argument_parser.add_argument(
+            "--socket", default=DaemonClient.socket_path(), metavar="PATH"
+        )
+        argument_parser.add_argument(
+            "--preload",
+            action="append",
+            default=[],
+            metavar="FILE",
+            help="load a module into the shared module cache before forking",
+        )
+        args = argument_parser.parse_args()
+
+        Daemon.preload(args.preload)
+        Daemon.serve(args.socket)
+
+    @staticmethod
+    def preload(paths: list[str]) -> None:
+        for name in ("scanner", "parser", "interpreter", "program"):
+            importlib.import_module(name)
+
+        from errors import LazyParseError, LoxRuntimeError
+        from module_loader import ModuleLoader
+
+        for path in paths:
+            token = Token(TokenType.IMPORT, "import", None, 0)
+            try:
+                ModuleLoader.load(token, os.path.abspath(path), None)
+            except LoxRuntimeError as error:
+                Lox.runtime_error(error)
+                exit(70)
+            except LazyParseError:
+                exit(65)
+
+    @staticmethod
+    def serve(path: str) -> None:
+        if os.path.exists(path):
+            os.unlink(path)
+
+        signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+        signal.signal(signal.SIGTERM, signal.default_int_handler)
+
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as listener:
+            listener.bind(path)
+            listener.listen(64)
+            try:
+                while True:
+                    connection, _ = listener.accept()
+                    sys.stdout.flush()
+                    sys.stderr.flush()
+
+                    if os.fork() == 0:
+                        listener.close()
+                        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+                        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                        Daemon.handle(connection)
+                    connection.close()
+            except KeyboardInterrupt:
+                pass
+            finally:
+                os.unlink(path)
+
+    @staticmethod
+    def handle(connection: socket.socket) -> None:
+        status = 1
+        try:
+            data, fds, _, _ = socket.recv_fds(connection, 65536, 3)
+            (length,) = struct.unpack("!I", data[:4])
+            while len(data) < length + 4:
+                chunk = connection.recv(length + 4 - len(data))
+                if not chunk:
+                    os._exit(1)
+                data += chunk
+            request = json.loads(data[4:])
+
+            for target, fd in enumerate(fds):
+                os.dup2(fd, target)
+                os.close(fd)
+            sys.stdin = open(0, closefd=False)
+            sys.stdout = open(1, "w", closefd=False)
+            sys.stderr = open(2, "w", closefd=False)
+
+            os.chdir(request["cwd"])
+            sys.argv = ["plox"] + request["argv"]
+            status = Daemon.run()
+        finally:
+            try:
+                sys.stdout.flush()
+                sys.stderr.flush()
+                connection.sendall(struct.pack("!i", status))
+            finally:
+                os._exit(0)
+
+    @staticmethod
+    def run() -> int:
+        try:
+            Lox.main()
+        except SystemExit as error:
+            if error.code is None or isinstance(error.code, int):
+                return error.code or 0
+            print(error.code, file=sys.stderr)
+            return 1
+        except BaseException:
+            traceback.print_exc()
+            return 1
+
+        return 0
+
+
+if __name__ == "__main__":
+    Daemon.main()
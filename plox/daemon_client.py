@@ -0,0 +1,39 @@
+import json
+import os
+import socket
+import struct
+import sys
+
+
+class DaemonClient:
+    @staticmethod
+    def main() -> None:
+        request = json.dumps({"argv": sys.argv[1:], "cwd": os.getcwd()}).encode()
+
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+            try:
+                connection.connect(DaemonClient.socket_path())
+            except OSError as error:
+                print(f"plox: can't connect to daemon: {error}", file=sys.stderr)
+                sys.exit(69)
+
+            message = struct.pack("!I", len(request)) + request
+            socket.send_fds(connection, [message], [0, 1, 2])
+
+            response = b""
+            while len(response) < 4:
+                chunk = connection.recv(4 - len(response))
+                if not chunk:
+                    print("plox: daemon closed the connection", file=sys.stderr)
+                    sys.exit(70)
+                response += chunk
+
+        sys.exit(struct.unpack("!i", response)[0])
+
+    @staticmethod
+    def socket_path() -> str:
+        return os.environ.get("PLOX_SOCKET", f"/tmp/plox-{os.getuid()}.sock")
+
+
+if __name__ == "__main__":
+    DaemonClient.main()
@@ -0,0 +1,477 @@
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from typing import NamedTuple
+
+from lox import Lox
+
+TYPES = ("number", "string", "bool", "list", "map")
+NAMES = ("a", "b", "c", "d", "e", "f", "g", "h")
+
+
+class ProgramGenerator:
+    def __init__(self, seed: int, size: int = 6, error_rate: float = 0.004) -> None:
+        self.random = random.Random(seed)
+        self.size = size
+        self.error_rate = error_rate
+        self.scopes: list[dict[str, str]] = []
+        self.counters = 0
+        self.lines: list[str] = []
+
+    def program(self, statements: int = 30) -> str:
+        self.scopes = [{}]
+        self.counters = 0
+        self.lines = []
+
+        for name, type in zip(NAMES, TYPES * 2):
+            self.emit(0, f"var {name} = {self.expression(type, 2)};")
+            self.scopes[-1][name] = type
+
+        for _ in range(statements):
+            self.statement(0)
+
+        return "\n".join(self.lines) + "\n"
+
+    def emit(self, depth: int, line: str) -> None:
+        self.lines.append("  " * depth + line)
+
+    def variables(self, type: str) -> list[str]:
+        seen: dict[str, str] = {}
+        for scope in reversed(self.scopes):
+            for name, declared in scope.items():
+                seen.setdefault(name, declared)
+
+        return [name for name, declared in seen.items() if declared == type]
+
+    def statement(self, depth: int) -> None:
+        if self.random.random() < self.error_rate:
+            self.emit(depth, self.error())
+            return
+
+        choice = self.random.random()
+        if depth >= 3:
+            choice *= 0.7
+
+        if choice < 0.15:
+            self.declaration(depth)
+        elif choice < 0.3:
+            self.emit(depth, f"print {self.expression(self.any_type(), 0)};")
+        elif choice < 0.45:
+            self.assignment(depth)
+        elif choice < 0.55:
+            self.mutation(depth)
+        elif choice < 0.62:
+            self.emit(depth, f"({self.expression(self.any_type(), 0)});")
+        elif choice < 0.7:
+            self.block(depth, "{")
+            self.emit(depth, "}")
+        elif choice < 0.8:
+            self.if_statement(depth)
+        elif choice < 0.9:
+            self.while_statement(depth)
+        else:
+            self.for_statement(depth)
+
+    def declaration(self, depth: int) -> None:
+        name = self.random.choice(NAMES)
+        type = self.random.choice(TYPES)
+        self.emit(depth, f"var {name} = {self.expression(type, 0)};")
+        self.scopes[-1][name] = type
+
+    def assignment(self, depth: int) -> None:
+        type = self.random.choice(TYPES)
+        names = self.variables(type)
+        if not names:
+            self.declaration(depth)
+            return
+
+        self.emit(depth, f"{self.random.choice(names)} = {self.expression(type, 0)};")
+
+    def mutation(self, depth: int) -> None:
+        number = self.expression("number", 1)
+        if self.random.random() < 0.5:
+            target = self.expression("list", 2)
+            if self.random.random() < 0.5:
+                self.emit(depth, f"append({target}, {number});")
+            else:
+                self.emit(depth, f"{target}[0] = {number};")
+        else:
+            key = self.random.choice(('"k"', '"k"', '"x"', '"y"'))
+            self.emit(depth, f"({self.expression('map', 2)})[{key}] = {number};")
+
+    def block(self, depth: int, opener: str) -> None:
+        self.emit(depth, opener)
+        self.scopes.append({})
+        for _ in range(self.random.randint(1, 4)):
+            self.statement(depth + 1)
+        self.scopes.pop()
+
+    def if_statement(self, depth: int) -> None:
+        self.block(depth, f"if ({self.condition()}) {{")
+        if self.random.random() < 0.5:
+            self.emit(depth, "}")
+            return
+
+        self.block(depth, "} else {")
+        self.emit(depth, "}")
+
+    def while_statement(self, depth: int) -> None:
+        counter = self.counter()
+        self.emit(depth, f"var {counter} = 0;")
+        self.block(depth, f"while ({counter} < {self.bound()}) {{")
+        self.emit(depth + 1, f"{counter} = {counter} + 1;")
+        self.emit(depth, "}")
+
+    def for_statement(self, depth: int) -> None:
+        counter = self.counter()
+        self.block(
+            depth,
+            f"for (var {counter} = 0; {counter} < {self.bound()};"
+            f" {counter} = {counter} + 1) {{",
+        )
+        self.emit(depth, "}")
+
+    def counter(self) -> str:
+        self.counters += 1
+        return f"i{self.counters}"
+
+    def bound(self) -> int:
+        return self.random.randint(1, self.size)
+
+    def condition(self) -> str:
+        if self.random.random() < 0.85:
+            return self.expression("bool", 0)
+        return self.expression(self.any_type(), 1)
+
+    def any_type(self) -> str:
+        return self.random.choice(TYPES + ("nil",))
+
+    def expression(self, type: str, depth: int) -> str:
+        if type == "nil":
+            return "nil"
+
+        names = self.variables(type)
+        if depth >= 3 or self.random.random() < 0.3:
+            if names and self.random.random() < 0.7:
+                return self.random.choice(names)
+            return self.literal(type)
+
+        match type:
+            case "number":
+                return self.number(depth + 1)
+            case "string":
+                operand = self.random.choice(names) if names else self.literal(type)
+                return f"{operand} + {self.literal(type)}"
+            case "bool":
+                return self.boolean(depth + 1)
+            case "list":
+                elements = [
+                    self.expression("number", depth + 1)
+                    for _ in range(self.random.randint(1, 3))
+                ]
+                return f"[{', '.join(elements)}]"
+            case _:
+                return (
+                    f'{{"k": {self.expression("number", depth + 1)},'
+                    f' "j": {self.expression("number", depth + 1)}}}'
+                )
+
+    def number(self, depth: int) -> str:
+        choice = self.random.random()
+        if choice < 0.45:
+            operator = self.random.choice(("+", "-", "*", "+", "-"))
+            left = self.expression("number", depth)
+            right = self.expression("number", depth)
+            return f"({left} {operator} {right})"
+        if choice < 0.55:
+            divisor = self.random.choice(("2", "4", "0.5", "3"))
+            return f"{self.expression('number', depth)} / {divisor}"
+        if choice < 0.65:
+            return f"-{self.expression('number', depth)}"
+        if choice < 0.75:
+            container = self.random.choice(("list", "map", "string"))
+            return f"len({self.expression(container, depth)})"
+        if choice < 0.85:
+            return f"{self.expression('list', depth)}[0]"
+        if choice < 0.95:
+            return f'{self.expression("map", depth)}["k"]'
+        return f"({self.expression('number', depth)})"
+
+    def boolean(self, depth: int) -> str:
+        choice = self.random.random()
+        if choice < 0.4:
+            operator = self.random.choice(("<", "<=", ">", ">="))
+            left = self.expression("number", depth)
+            right = self.expression("number", depth)
+            return f"({left} {operator} {right})"
+        if choice < 0.6:
+            operator = self.random.choice(("==", "!="))
+            left = self.expression(self.any_type(), depth)
+            right = self.expression(self.any_type(), depth)
+            return f"({left} {operator} {right})"
+        if choice < 0.8:
+            operator = self.random.choice(("and", "or"))
+            left = self.expression("bool", depth)
+            right = self.expression("bool", depth)
+            return f"({left} {operator} {right})"
+        if choice < 0.9:
+            return f"!{self.expression('bool', depth)}"
+        key = self.random.choice(('"k"', '"x"'))
+        return f"has({self.expression('map', depth)}, {key})"
+
+    def literal(self, type: str) -> str:
+        match type:
+            case "number":
+                return self.random.choice(("0", "1", "2", "3", "10", "0.5", "2.25"))
+            case "string":
+                return self.random.choice(('"a"', '"b"', '"lox"', '""'))
+            case "bool":
+                return self.random.choice(("true", "false"))
+            case "list":
+                return f"[{self.literal('number')}]"
+            case _:
+                return f'{{"k": {self.literal("number")}}}'
+
+    def error(self) -> str:
+        return self.random.choice(
+            (
+                f"print -{self.expression('string', 1)};",
+                f"print {self.expression('number', 1)} + {self.literal('string')};",
+                "print undefined;",
+                f"print {self.expression('list', 1)}[100];",
+                f'print {self.expression("map", 1)}["missing"];',
+                f"print {self.expression('number', 1)}(1);",
+                f"print len({self.expression('number', 1)});",
+                f"print {self.expression('bool', 1)} < 1;",
+            )
+        )
+
+
+class Run(NamedTuple):
+    output: str
+    status: int
+    errors: str
+    elapsed: float
+
+
+class Differential:
+    engines = ("interpreter", "tiered", "checked", "async", "lazy", "mmap", "parallel")
+
+    @staticmethod
+    def main() -> None:
+        argument_parser = argparse.ArgumentParser(prog="plox-differential")
+        argument_parser.add_argument(
+            "-n",
+            "--programs",
+            type=int,
+            default=50,
+            metavar="N",
+            help="number of random programs to run",
+        )
+        argument_parser.add_argument(
+            "--seed", type=int, default=0, help="seed of the first program"
+        )
+        argument_parser.add_argument(
+            "--size",
+            type=int,
+            default=6,
+            metavar="N",
+            help="run every generated loop at most N times",
+        )
+        argument_parser.add_argument(
+            "--engines",
+            default=",".join(Differential.engines),
+            help="comma-separated engines to compare against the first",
+        )
+        argument_parser.add_argument(
+            "--expect",
+            action="append",
+            default=[],
+            metavar="ENGINE=RATIO",
+            help="fail unless ENGINE runs at least RATIO times the first's speed",
+        )
+        argument_parser.add_argument(
+            "--keep", metavar="DIR", help="save programs that disagree into DIR"
+        )
+        argument_parser.add_argument(
+            "--show", action="store_true", help="print the first program and exit"
+        )
+        argument_parser.add_argument("--engine", help=argparse.SUPPRESS)
+        argument_parser.add_argument("script", nargs="?", help=argparse.SUPPRESS)
+        args = argument_parser.parse_args()
+
+        if args.engine is not None:
+            Differential.run_engine(args.engine, args.script)
+            return
+
+        if args.show:
+            sys.stdout.write(ProgramGenerator(args.seed, args.size).program())
+            return
+
+        engines = args.engines.split(",")
+        unknown = [engine for engine in engines if engine not in Differential.engines]
+        if unknown:
+            argument_parser.error(f"unknown engines: {', '.join(unknown)}")
+
+        expected: dict[str, float] = {}
+        for expectation in args.expect:
+            engine, _, ratio = expectation.partition("=")
+            try:
+                expected[engine] = float(ratio)
+            except ValueError:
+                argument_parser.error(f"invalid expectation {expectation!r}")
+
+        failures = Differential.compare(
+            engines, args.seed, args.programs, args.size, args.keep, expected
+        )
+        if failures:
+            exit(1)
+
+    @staticmethod
+    def compare(
+        engines: list[str],
+        seed: int,
+        programs: int,
+        size: int,
+        keep: str | None,
+        expected: dict[str, float],
+    ) -> int:
+        totals = dict.fromkeys(engines, 0.0)
+        agreed = dict.fromkeys(engines, 0)
+        failures = 0
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "program.lox")
+            for program_seed in range(seed, seed + programs):
+                source = ProgramGenerator(program_seed, size).program()
+                with open(path, "w") as file:
+                    file.write(source)
+
+                runs = {engine: Differential.run(engine, path) for engine in engines}
+                reference = runs[engines[0]]
+
+                disagreed = False
+                for engine, run in runs.items():
+                    totals[engine] += run.elapsed
+                    problem = Differential.difference(reference, run)
+                    if problem is None:
+                        agreed[engine] += 1
+                        continue
+
+                    disagreed = True
+                    failures += 1
+                    print(f"seed {program_seed}: {engine} {problem}")
+
+                if disagreed and keep is not None:
+                    os.makedirs(keep, exist_ok=True)
+                    with open(os.path.join(keep, f"{program_seed}.lox"), "w") as file:
+                        file.write(source)
+
+        print(f"{'engine':<12} {'agreed':>9} {'seconds':>9} {'speed':>7}")
+        for engine in engines:
+            ratio = totals[engines[0]] / totals[engine] if totals[engine] else 0.0
+            print(
+                f"{engine:<12} {agreed[engine]:>5}/{programs:<3}"
+                f" {totals[engine]:>9.3f} {ratio:>6.2f}x"
+            )
+
+            minimum = expected.get(engine)
+            if minimum is not None and ratio < minimum:
+                failures += 1
+                print(f"{engine}: expected at least {minimum:.2f}x, got {ratio:.2f}x")
+
+        return failures
+
+    @staticmethod
+    def difference(reference: Run, run: Run) -> str | None:
+        if run.status not in (0, 65, 70):
+            last = run.errors.strip().splitlines()[-1:] or [""]
+            return f"crashed with status {run.status}: {last[0]}"
+
+        if run.status != reference.status:
+            return f"exited with {run.status} instead of {reference.status}"
+
+        for stream, expected, actual in (
+            ("printed", reference.output, run.output),
+            ("reported", reference.errors, run.errors),
+        ):
+            if actual != expected:
+                return Differential.first_difference(stream, expected, actual)
+
+        return None
+
+    @staticmethod
+    def first_difference(stream: str, expected: str, actual: str) -> str:
+        expected_lines = expected.splitlines()
+        actual_lines = actual.splitlines()
+        for line, (left, right) in enumerate(zip(expected_lines, actual_lines)):
+            if left != right:
+                return f"{stream} {right!r} instead of {left!r} on line {line + 1}"
+        return f"{stream} {len(actual_lines)} lines instead of {len(expected_lines)}"
+
+    @staticmethod
+    def run(engine: str, path: str) -> Run:
+        process = subprocess.run(
+            [sys.executable, __file__, "--engine", engine, path],
+            capture_output=True,
+            text=True,
+        )
+
+        errors = process.stderr.splitlines()
+        elapsed = 0.0
+        if errors and errors[-1].startswith("elapsed "):
+            elapsed = float(errors.pop().removeprefix("elapsed "))
+
+        return Run(process.stdout, process.returncode, "\n".join(errors), elapsed)
+
+    @staticmethod
+    def run_engine(engine: str, path: str) -> None:
+        from module_loader import ModuleLoader
+
+        ModuleLoader.search_path = [os.path.dirname(path) or "."]
+        Lox.tier_threshold = None
+        match engine:
+            case "tiered":
+                Lox.tier_threshold = 1
+            case "checked":
+                Lox.type_inference = False
+            case "lazy":
+                Lox.lazy = True
+            case "mmap":
+                Lox.mmap = True
+            case "parallel":
+                from parallel import ParallelParser
+
+                ParallelParser.threshold = 0
+                Lox.jobs = 2
+
+        start = time.perf_counter()
+        try:
+            if engine == "async":
+                Differential.run_async(path)
+            else:
+                Lox.run_file(path)
+        finally:
+            sys.stdout.flush()
+            print(f"elapsed {time.perf_counter() - start}", file=sys.stderr)
+
+    @staticmethod
+    def run_async(path: str) -> None:
+        with open(path) as file:
+            source = file.read()
+
+        asyncio.run(Lox.run_async(source))
+
+        if Lox.had_error:
+            exit(65)
+        if Lox.had_runtime_error:
+            exit(70)
+
+
+if __name__ == "__main__":
+    Differential.main()
@@ -1,4 +1,6 @@
 from __future__ import annotations
+import itertools
+import sys
 from typing import Any
 
 from tokens import Token
@@ -6,13 +8,42 @@ from errors import LoxRuntimeError
 
 
 class Environment:
+    __slots__ = ("values", "enclosing")
+
+    pool: list[Environment] = []
+    pool_size = 256
+    allocations = 0
+
     def __init__(self, enclosing: Environment | None = None) -> None:
-        self.values: dict[str, Any] = {}
+        Environment.allocations += 1
+        self.values: dict[str, Any] | None = None
         self.enclosing = enclosing
 
+    @staticmethod
+    def acquire(enclosing: Environment) -> Environment:
+        if Environment.pool:
+            environment = Environment.pool.pop()
+            environment.enclosing = enclosing
+            return environment
+
+        return Environment(enclosing)
+
+    @classmethod
+    def release(cls, environment: Environment, references: int = 1) -> None:
+        # CPython only: getrefcount also sees this parameter and its own argument,
+        # so anything above the caller's references means the scope escaped.
+        if sys.getrefcount(environment) > references + 2:
+            return
+
+        environment.values = None
+        environment.enclosing = None
+        if len(cls.pool) < cls.pool_size:
+            cls.pool.append(environment)
+
     def get(self, name: Token) -> Any:
-        if name.lexeme in self.values:
-            return self.values[name.lexeme]
+        values = self.values
+        if values is not None and name.lexeme in values:
+            return values[name.lexeme]
 
         if self.enclosing:
             return self.enclosing.get(name)
@@ -20,8 +51,9 @@ class Environment:
         raise LoxRuntimeError(name, f"undefined variable {name.lexeme}")
 
     def assign(self, name: Token, value: Any) -> None:
-        if name.lexeme in self.values:
-            self.values[name.lexeme] = value
+        values = self.values
+        if values is not None and name.lexeme in values:
+            values[name.lexeme] = value
             return
 
         if self.enclosing:
@@ -30,5 +62,62 @@ class Environment:
 
         raise LoxRuntimeError(name, f"undefined variable {name.lexeme}")
 
+    def define(self, name: str, value: Any) -> None:
+        if self.values is None:
+            self.values = {name: value}
+        else:
+            self.values[name] = value
+
+
+class Cell:
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any) -> None:
+        self.value = value
+
+
+class InlineCache:
+    __slots__ = ("version", "cell")
+
+    def __init__(self) -> None:
+        self.version = -1
+        self.cell = Cell(None)
+
+
+class GlobalEnvironment(Environment):
+    __slots__ = ("cells", "version")
+
+    versions = itertools.count()
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.values: dict[str, Any] = {}
+        self.cells: dict[str, Cell] = {}
+        self.version = next(GlobalEnvironment.versions)
+
+    def assign(self, name: Token, value: Any) -> None:
+        cell = self.cells.get(name.lexeme)
+        if cell is None:
+            raise LoxRuntimeError(name, f"undefined variable {name.lexeme}")
+
+        cell.value = value
+        self.values[name.lexeme] = value
+
     def define(self, name: str, value: Any) -> None:
         self.values[name] = value
+        self.cells[name] = Cell(value)
+        self.version = next(GlobalEnvironment.versions)
+
+    def replace(self, values: dict[str, Any]) -> None:
+        self.values = values
+        self.cells = {name: Cell(value) for name, value in values.items()}
+        self.version = next(GlobalEnvironment.versions)
+
+    def lookup(self, name: Token, cache: InlineCache) -> Cell:
+        cell = self.cells.get(name.lexeme)
+        if cell is None:
+            raise LoxRuntimeError(name, f"undefined variable {name.lexeme}")
+
+        cache.version = self.version
+        cache.cell = cell
+        return cell
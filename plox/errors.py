@@ -5,7 +5,23 @@ class ParseError(RuntimeError):
     pass
 
 
+class LazyParseError(RuntimeError):
+    pass
+
+
 class LoxRuntimeError(RuntimeError):
     def __init__(self, token: Token, message: str) -> None:
         self.token = token
         self.message = message
+
+
+class SerializationError(RuntimeError):
+    pass
+
+
+class SnapshotError(RuntimeError):
+    pass
+
+
+class CompileError(RuntimeError):
+    pass
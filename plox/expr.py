@@ -2,10 +2,15 @@ from __future__ import annotations
 from abc import ABC, abstractmethod
 from typing import Any
 
+from environment import InlineCache
 from tokens import Token
 
 
 class Expr(ABC):
+    unchecked: bool = False
+
+    cache: InlineCache | None = None
+
     @abstractmethod
     def accept(self, visitor: ExprVisitor) -> Any:
         pass
@@ -20,10 +25,22 @@ class ExprVisitor(ABC):
     def visit_binary_expr(self, expr: Binary) -> Any:
         pass
 
+    @abstractmethod
+    def visit_call_expr(self, expr: Call) -> Any:
+        pass
+
     @abstractmethod
     def visit_grouping_expr(self, expr: Grouping) -> Any:
         pass
 
+    @abstractmethod
+    def visit_index_expr(self, expr: Index) -> Any:
+        pass
+
+    @abstractmethod
+    def visit_list_literal_expr(self, expr: ListLiteral) -> Any:
+        pass
+
     @abstractmethod
     def visit_literal_expr(self, expr: Literal) -> Any:
         pass
@@ -32,6 +49,14 @@ class ExprVisitor(ABC):
     def visit_logical_expr(self, expr: Logical) -> Any:
         pass
 
+    @abstractmethod
+    def visit_map_literal_expr(self, expr: MapLiteral) -> Any:
+        pass
+
+    @abstractmethod
+    def visit_set_index_expr(self, expr: SetIndex) -> Any:
+        pass
+
     @abstractmethod
     def visit_unary_expr(self, expr: Unary) -> Any:
         pass
@@ -60,6 +85,16 @@ class Binary(Expr):
         return visitor.visit_binary_expr(self)
 
 
+class Call(Expr):
+    def __init__(self, callee: Expr, paren: Token, arguments: list[Expr]) -> None:
+        self.callee = callee
+        self.paren = paren
+        self.arguments = arguments
+
+    def accept(self, visitor: ExprVisitor) -> Any:
+        return visitor.visit_call_expr(self)
+
+
 class Grouping(Expr):
     def __init__(self, expression: Expr) -> None:
         self.expression = expression
@@ -68,6 +103,25 @@ class Grouping(Expr):
         return visitor.visit_grouping_expr(self)
 
 
+class Index(Expr):
+    def __init__(self, object: Expr, bracket: Token, index: Expr) -> None:
+        self.object = object
+        self.bracket = bracket
+        self.index = index
+
+    def accept(self, visitor: ExprVisitor) -> Any:
+        return visitor.visit_index_expr(self)
+
+
+class ListLiteral(Expr):
+    def __init__(self, bracket: Token, elements: list[Expr]) -> None:
+        self.bracket = bracket
+        self.elements = elements
+
+    def accept(self, visitor: ExprVisitor) -> Any:
+        return visitor.visit_list_literal_expr(self)
+
+
 class Literal(Expr):
     def __init__(self, value: Any) -> None:
         self.value = value
@@ -86,6 +140,27 @@ class Logical(Expr):
         return visitor.visit_logical_expr(self)
 
 
+class MapLiteral(Expr):
+    def __init__(self, brace: Token, keys: list[Expr], values: list[Expr]) -> None:
+        self.brace = brace
+        self.keys = keys
+        self.values = values
+
+    def accept(self, visitor: ExprVisitor) -> Any:
+        return visitor.visit_map_literal_expr(self)
+
+
+class SetIndex(Expr):
+    def __init__(self, object: Expr, bracket: Token, index: Expr, value: Expr) -> None:
+        self.object = object
+        self.bracket = bracket
+        self.index = index
+        self.value = value
+
+    def accept(self, visitor: ExprVisitor) -> Any:
+        return visitor.visit_set_index_expr(self)
+
+
 class Unary(Expr):
     def __init__(self, operator: Token, right: Expr) -> None:
         self.operator = operator
@@ -0,0 +1,239 @@
+import contextlib
+import io
+from bisect import bisect_left
+from typing import Any
+
+from environment import InlineCache
+from expr import Expr
+from lazy_parser import LazyScanner
+from lox import Lox
+from parser import Parser
+from stmt import Block, If, Stmt, While
+from tokens import Token, TokenType
+
+
+class Document:
+    chunk = 4096
+
+    def __init__(self, source: str) -> None:
+        self.source = source
+        self.tokens: list[Token] = []
+        self.offsets: list[int] = []
+        self.starts: list[int] = []
+        self.statements: list[Stmt] = []
+        self.failed = False
+
+        self.parse_full()
+        self.infer()
+
+    def update(self, source: str) -> list[Stmt]:
+        old = self.source
+        limit = min(len(old), len(source))
+
+        start = Document.common_prefix(old, source, limit)
+        end = Document.common_prefix(old[::-1], source[::-1], limit - start)
+
+        return self.edit(start, len(old) - end, source[start : len(source) - end])
+
+    def edit(self, start: int, end: int, text: str) -> list[Stmt]:
+        self.source = self.source[:start] + text + self.source[end:]
+
+        if (
+            self.failed
+            or not self.starts
+            or not self.parse_incremental(start, end, text)
+        ):
+            self.parse_full()
+
+        self.infer()
+        return self.statements
+
+    def parse_full(self) -> None:
+        had_error = Lox.had_error
+        Lox.had_error = False
+
+        scanner = LazyScanner(self.source)
+        self.tokens = scanner.scan_tokens()
+        self.offsets = scanner.offsets + [len(self.source)]
+
+        parser = Parser(self.tokens)
+        self.starts = []
+        self.statements = []
+        while not parser.is_at_end():
+            self.starts.append(parser.current)
+            statement = parser.declaration()
+            if statement is not None:
+                self.statements.append(statement)
+
+        self.failed = Lox.had_error
+        Lox.had_error = had_error or self.failed
+
+    def parse_incremental(self, start: int, end: int, text: str) -> bool:
+        had_error = Lox.had_error
+        Lox.had_error = False
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                return self.reparse(start, end, text) and not Lox.had_error
+        finally:
+            Lox.had_error = had_error
+
+    def reparse(self, start: int, end: int, text: str) -> bool:
+        delta = len(text) - (end - start)
+        edit_end = start + len(text)
+
+        declaration_offsets = [self.offsets[index] for index in self.starts]
+        first = max(bisect_left(declaration_offsets, start) - 2, 0)
+        first_token = self.starts[first]
+
+        scanner = LazyScanner(self.source, self.tokens[first_token].line)
+        scanner.current = declaration_offsets[first]
+
+        following = bisect_left(declaration_offsets, end + 1)
+        resume = len(self.starts)
+        while not scanner.is_at_end():
+            position = scanner.current - delta
+            if scanner.current > edit_end and following < len(self.starts):
+                while (
+                    following < len(self.starts)
+                    and declaration_offsets[following] < position
+                ):
+                    following += 1
+                if (
+                    following < len(self.starts)
+                    and declaration_offsets[following] == position
+                ):
+                    resume = following
+                    break
+
+            scanner.start = scanner.current
+            scanner.scan_token()
+
+        if resume < len(self.starts):
+            resume_token = self.starts[resume]
+            lines = scanner.line - self.tokens[resume_token].line
+            suffix = self.tokens[resume_token:]
+            suffix_offsets = [offset + delta for offset in self.offsets[resume_token:]]
+            if lines:
+                for token in suffix:
+                    token.line += lines
+        else:
+            resume_token = len(self.tokens) - 1
+            lines = 0
+            suffix = [Token(TokenType.EOF, "", None, scanner.line)]
+            suffix_offsets = [len(self.source)]
+
+        tokens = self.tokens[:first_token] + scanner.tokens + suffix
+        offsets = self.offsets[:first_token] + scanner.offsets + suffix_offsets
+        shift = first_token + len(scanner.tokens) - resume_token
+
+        parser = Parser(tokens)
+        parser.current = first_token
+        starts = self.starts[:first]
+        statements = self.statements[:first]
+        reused = len(self.starts)
+        candidate = resume
+        while not parser.is_at_end():
+            if parser.current >= first_token + len(scanner.tokens):
+                while (
+                    candidate < len(self.starts)
+                    and self.starts[candidate] + shift < parser.current
+                ):
+                    candidate += 1
+                if (
+                    candidate < len(self.starts)
+                    and self.starts[candidate] + shift == parser.current
+                ):
+                    reused = candidate
+                    break
+
+            starts.append(parser.current)
+            statement = parser.declaration()
+            if statement is None:
+                return False
+            statements.append(statement)
+
+        for index in range(reused, len(self.starts)):
+            starts.append(self.starts[index] + shift)
+            statement = self.statements[index]
+            if lines:
+                Document.shift_lines(statement, lines)
+            statements.append(statement)
+
+        self.tokens = tokens
+        self.offsets = offsets
+        self.starts = starts
+        self.statements = statements
+        return True
+
+    def infer(self) -> None:
+        Lox.infer(self.statements)
+
+    def verify(self) -> bool:
+        with contextlib.redirect_stdout(io.StringIO()):
+            had_error = Lox.had_error
+            full = Document(self.source)
+            Lox.had_error = had_error
+
+        return Document.same(self.tokens, full.tokens) and Document.same(
+            self.statements, full.statements
+        )
+
+    @staticmethod
+    def common_prefix(left: str, right: str, limit: int) -> int:
+        chunk = Document.chunk
+        start = 0
+        while start + chunk <= limit and (
+            left[start : start + chunk] == right[start : start + chunk]
+        ):
+            start += chunk
+
+        low = start
+        high = min(start + chunk, limit)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if left[start:middle] == right[start:middle]:
+                low = middle
+            else:
+                high = middle - 1
+
+        return low
+
+    @staticmethod
+    def shift_lines(stmt: Stmt, lines: int) -> None:
+        stmt.line += lines
+
+        match stmt:
+            case Block():
+                for statement in stmt.statements:
+                    Document.shift_lines(statement, lines)
+            case If():
+                Document.shift_lines(stmt.then_branch, lines)
+                if stmt.else_branch is not None:
+                    Document.shift_lines(stmt.else_branch, lines)
+            case While():
+                Document.shift_lines(stmt.body, lines)
+
+    @staticmethod
+    def same(left: Any, right: Any) -> bool:
+        if type(left) is not type(right):
+            return False
+
+        if isinstance(left, (list, tuple)):
+            return len(left) == len(right) and all(
+                Document.same(a, b) for a, b in zip(left, right)
+            )
+        if isinstance(left, Token):
+            return Document.same(
+                (left.type, left.lexeme, left.literal, left.line),
+                (right.type, right.lexeme, right.literal, right.line),
+            )
+        if isinstance(left, (Expr, Stmt)):
+            return Document.same(vars(left), vars(right))
+        if isinstance(left, InlineCache):
+            return True
+        if isinstance(left, dict):
+            return left.keys() == right.keys() and all(
+                Document.same(left[key], right[key]) for key in left
+            )
+
+        return bool(left == right)
@@ -1,26 +1,65 @@
-from typing import Any
+import operator
+from typing import Any, Callable
 
-from environment import Environment
-from errors import LoxRuntimeError
+from environment import Environment, GlobalEnvironment
+from errors import LazyParseError, LoxRuntimeError
 from expr import (
     Assign,
     Binary,
+    Call,
     Expr,
     ExprVisitor,
     Grouping,
+    Index,
+    ListLiteral,
     Literal,
     Logical,
+    MapLiteral,
+    SetIndex,
     Unary,
     Variable,
 )
 from lox import Lox
-from stmt import Block, Expression, If, Print, Stmt, StmtVisitor, Var, While
+from lox_callable import LoxCallable
+from lox_list import LoxList
+from lox_map import LoxMap
+from module_loader import ModuleLoader
+from natives import Natives
+from stats import Stats
+from stmt import Block, Expression, If, Import, Print, Stmt, StmtVisitor, Var, While
 from tokens import Token, TokenType
 
+Hook = Callable[[str, Stmt, Environment, Any], None]
+
 
 class Interpreter(ExprVisitor, StmtVisitor):
-    def __init__(self) -> None:
-        self.environment = Environment()
+    unchecked_operators: dict[TokenType, Callable[[Any, Any], Any]] = {
+        TokenType.MINUS: operator.sub,
+        TokenType.SLASH: operator.truediv,
+        TokenType.STAR: operator.mul,
+        TokenType.PLUS: operator.add,
+        TokenType.GREATER: operator.gt,
+        TokenType.GREATER_EQUAL: operator.ge,
+        TokenType.LESS: operator.lt,
+        TokenType.LESS_EQUAL: operator.le,
+    }
+
+    def __init__(self, directory: str | None = None) -> None:
+        self.directory = directory
+        self.globals = GlobalEnvironment()
+        self.environment: Environment = self.globals
+
+        Natives.define(self.globals)
+
+        self.hooks: tuple[Hook, ...] = ()
+        self.hook_line = -1
+        self.hook_error: LoxRuntimeError | None = None
+
+        self.stats: Stats | None = None
+
+        self.tier_threshold = Lox.tier_threshold
+        self.loop_counts: dict[While, int] = {}
+        self.compiled_loops: dict[While, Callable[[], Any]] = {}
 
     def interpret(self, statements: list[Stmt]) -> None:
         try:
@@ -28,6 +67,8 @@ class Interpreter(ExprVisitor, StmtVisitor):
                 self.execute(statement)
         except LoxRuntimeError as error:
             Lox.runtime_error(error)
+        except LazyParseError:
+            pass
 
     def evaluate(self, expr: Expr) -> Any:
         return expr.accept(self)
@@ -35,6 +76,43 @@ class Interpreter(ExprVisitor, StmtVisitor):
     def execute(self, stmt: Stmt) -> Any:
         stmt.accept(self)
 
+    def add_hook(self, hook: Hook) -> None:
+        self.hooks += (hook,)
+        setattr(self, "execute", self.execute_hooked)
+
+    def remove_hook(self, hook: Hook) -> None:
+        hooks = list(self.hooks)
+        hooks.remove(hook)
+        self.hooks = tuple(hooks)
+        if not self.hooks:
+            delattr(self, "execute")
+
+    def execute_hooked(self, stmt: Stmt) -> Any:
+        environment = self.environment
+        if stmt.line != self.hook_line:
+            self.hook_line = stmt.line
+            for hook in self.hooks:
+                hook("line", stmt, environment, None)
+
+        for hook in self.hooks:
+            hook("statement", stmt, environment, None)
+
+        try:
+            stmt.accept(self)
+        except LoxRuntimeError as error:
+            if error is not self.hook_error:
+                self.hook_error = error
+                for hook in self.hooks:
+                    hook("error", stmt, self.environment, error)
+            raise
+
+    def enable_stats(self, stats: Stats | None = None) -> Stats:
+        if self.stats is None:
+            self.stats = stats if stats is not None else Stats()
+            self.stats.install(self)
+
+        return self.stats
+
     def execute_block(self, statements: list[Stmt], environment: Environment) -> None:
         previous = self.environment
         try:
@@ -46,7 +124,9 @@ class Interpreter(ExprVisitor, StmtVisitor):
             self.environment = previous
 
     def visit_block_stmt(self, stmt: Block) -> Any:
-        self.execute_block(stmt.statements, Environment(self.environment))
+        environment = Environment.acquire(self.environment)
+        self.execute_block(stmt.statements, environment)
+        Environment.release(environment)
 
     def visit_expression_stmt(self, stmt: Expression) -> Any:
         self.evaluate(stmt.expression)
@@ -57,6 +137,11 @@ class Interpreter(ExprVisitor, StmtVisitor):
         elif stmt.else_branch:
             self.execute(stmt.else_branch)
 
+    def visit_import_stmt(self, stmt: Import) -> Any:
+        module = ModuleLoader.load(stmt.keyword, stmt.path.literal, self.directory)
+        for name, value in module.exports().items():
+            self.environment.define(name, value)
+
     def visit_print_stmt(self, stmt: Print) -> Any:
         value = self.evaluate(stmt.expression)
         print(self.stringify(value))
@@ -69,18 +154,77 @@ class Interpreter(ExprVisitor, StmtVisitor):
         self.environment.define(stmt.name.lexeme, value)
 
     def visit_while_stmt(self, stmt: While) -> Any:
-        while self.is_truthy(self.evaluate(stmt.condition)):
-            self.execute(stmt.body)
+        loop = self.compiled_loops.get(stmt)
+        if loop is not None and not self.is_shadowed():
+            loop()
+            return
+
+        threshold = self.tier_threshold
+        if threshold is None:
+            while self.is_truthy(self.evaluate(stmt.condition)):
+                self.execute(stmt.body)
+            return
+
+        count = self.loop_counts.get(stmt, 0)
+        try:
+            while self.is_truthy(self.evaluate(stmt.condition)):
+                self.execute(stmt.body)
+                count += 1
+                if count == threshold:
+                    loop = self.tier_up(stmt, count)
+                    if loop is not None:
+                        loop()
+                        return
+        finally:
+            self.loop_counts[stmt] = count
+
+    def tier_up(self, stmt: While, count: int) -> Callable[[], Any] | None:
+        if self.is_shadowed():
+            return None
+
+        from compiler import Compiler
+
+        loop = Compiler(self).compile_loop(stmt)
+        if loop is not None:
+            self.compiled_loops[stmt] = loop
+        if Lox.tier_log is not None:
+            outcome = "compiled" if loop is not None else "not compiled"
+            print(
+                f"[tier] while at line {stmt.line} {outcome} after {count} iterations",
+                file=Lox.tier_log,
+            )
+
+        return loop
+
+    def is_shadowed(self) -> bool:
+        return any(
+            name in ("execute", "execute_block") or name.startswith("visit_")
+            for name in vars(self)
+        )
 
     def visit_assign_expr(self, expr: Assign) -> Any:
         value = self.evaluate(expr.value)
-        self.environment.assign(expr.name, value)
+
+        cache = expr.cache
+        if cache is None:
+            self.environment.assign(expr.name, value)
+            return value
+
+        globals = self.globals
+        if cache.version == globals.version:
+            cache.cell.value = value
+        else:
+            globals.lookup(expr.name, cache).value = value
+        globals.values[expr.name.lexeme] = value
         return value
 
     def visit_binary_expr(self, expr: Binary) -> Any:
         left = self.evaluate(expr.left)
         right = self.evaluate(expr.right)
 
+        if expr.unchecked:
+            return Interpreter.unchecked_operators[expr.operator.type](left, right)
+
         match expr.operator.type:
             case TokenType.MINUS:
                 self.check_number_operands(expr.operator, left, right)
@@ -116,9 +260,37 @@ class Interpreter(ExprVisitor, StmtVisitor):
             case TokenType.EQUAL_EQUAL:
                 return self.is_equal(left, right)
 
+    def visit_call_expr(self, expr: Call) -> Any:
+        callee = self.evaluate(expr.callee)
+
+        arguments = [self.evaluate(argument) for argument in expr.arguments]
+
+        if not isinstance(callee, LoxCallable):
+            raise LoxRuntimeError(expr.paren, "can only call functions")
+
+        if len(arguments) != callee.arity():
+            raise LoxRuntimeError(
+                expr.paren,
+                f"expected {callee.arity()} arguments but got {len(arguments)}",
+            )
+
+        return callee.call(self, arguments, expr.paren)
+
     def visit_grouping_expr(self, expr: Grouping) -> Any:
         return self.evaluate(expr.expression)
 
+    def visit_index_expr(self, expr: Index) -> Any:
+        object = self.evaluate(expr.object)
+        index = self.evaluate(expr.index)
+
+        if isinstance(object, (LoxList, LoxMap)):
+            return object.get(expr.bracket, index)
+
+        raise LoxRuntimeError(expr.bracket, "only lists and maps can be indexed")
+
+    def visit_list_literal_expr(self, expr: ListLiteral) -> Any:
+        return LoxList([self.evaluate(element) for element in expr.elements])
+
     def visit_literal_expr(self, expr: Literal) -> Any:
         return expr.value
 
@@ -134,9 +306,33 @@ class Interpreter(ExprVisitor, StmtVisitor):
 
         return self.evaluate(expr.right)
 
+    def visit_map_literal_expr(self, expr: MapLiteral) -> Any:
+        entries = {}
+        for key, value in zip(expr.keys, expr.values):
+            entries[self.evaluate(key)] = self.evaluate(value)
+
+        return LoxMap(entries)
+
+    def visit_set_index_expr(self, expr: SetIndex) -> Any:
+        object = self.evaluate(expr.object)
+        index = self.evaluate(expr.index)
+        value = self.evaluate(expr.value)
+
+        if isinstance(object, LoxList):
+            object.set(expr.bracket, index, value)
+        elif isinstance(object, LoxMap):
+            object.set(index, value)
+        else:
+            raise LoxRuntimeError(expr.bracket, "only lists and maps can be indexed")
+
+        return value
+
     def visit_unary_expr(self, expr: Unary) -> Any:
         right = self.evaluate(expr.right)
 
+        if expr.unchecked:
+            return -right
+
         match expr.operator.type:
             case TokenType.MINUS:
                 self.check_number_operand(expr.operator, right)
@@ -147,7 +343,13 @@ class Interpreter(ExprVisitor, StmtVisitor):
         return None
 
     def visit_variable_expr(self, expr: Variable) -> Any:
-        return self.environment.get(expr.name)
+        cache = expr.cache
+        if cache is None:
+            return self.environment.get(expr.name)
+
+        if cache.version == self.globals.version:
+            return cache.cell.value
+        return self.globals.lookup(expr.name, cache).value
 
     def check_number_operand(self, operator: Token, operand: Any) -> None:
         if isinstance(operand, float):
@@ -173,7 +375,7 @@ class Interpreter(ExprVisitor, StmtVisitor):
     def is_equal(self, a: Any, b: Any) -> bool:
         return bool(a == b)
 
-    def stringify(self, value: Any) -> str:
+    def stringify(self, value: Any, seen: set[int] | None = None) -> str:
         if value is None:
             return "nil"
 
@@ -186,4 +388,34 @@ class Interpreter(ExprVisitor, StmtVisitor):
                 text = text[0 : len(text) - 2]
             return text
 
+        if isinstance(value, (LoxList, LoxMap)):
+            if seen is None:
+                seen = set()
+            if id(value) in seen:
+                return "[...]" if isinstance(value, LoxList) else "{...}"
+
+            seen.add(id(value))
+            try:
+                if isinstance(value, LoxList):
+                    elements = ", ".join(
+                        self.stringify_element(element, seen)
+                        for element in value.elements
+                    )
+                    return f"[{elements}]"
+
+                entries = ", ".join(
+                    f"{self.stringify_element(key, seen)}: "
+                    f"{self.stringify_element(element, seen)}"
+                    for key, element in value.entries.items()
+                )
+                return f"{{{entries}}}"
+            finally:
+                seen.discard(id(value))
+
         return str(value)
+
+    def stringify_element(self, value: Any, seen: set[int]) -> str:
+        if isinstance(value, str):
+            return f'"{value}"'
+
+        return self.stringify(value, seen)
@@ -0,0 +1,149 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+
+from errors import LazyParseError, ParseError
+from lox import Lox
+from parser import Parser
+from scanner import Scanner
+from stmt import Block, Stmt
+from tokens import Token, TokenType
+
+if TYPE_CHECKING:
+    from type_inference import Scope
+
+
+class LazyScanner(Scanner):
+    def __init__(self, source: str, line: int = 0) -> None:
+        super().__init__(source)
+        self.line = line
+        self.offsets: list[int] = []
+
+    def add_token(self, type: TokenType, literal: object = None) -> None:
+        self.offsets.append(self.start)
+        super().add_token(type, literal)
+
+
+class LazyBlock(Block):
+    def __init__(
+        self,
+        brace: Token,
+        source: str,
+        start: int,
+        end: int,
+        names: set[str],
+        identifiers: set[str],
+    ) -> None:
+        self.brace = brace
+        self.source = source
+        self.start = start
+        self.end = end
+        self.names = names
+        self.identifiers = identifiers
+        self.parsed: list[Stmt] | None = None
+        self.context: Scope | None = None
+        self.scopes: list[set[str]] | None = None
+
+    @property
+    def statements(self) -> list[Stmt]:
+        if self.parsed is None:
+            self.parsed = self.parse()
+        return self.parsed
+
+    @statements.setter
+    def statements(self, statements: list[Stmt]) -> None:
+        self.parsed = statements
+
+    def parse(self) -> list[Stmt]:
+        had_error = Lox.had_error
+        Lox.had_error = False
+
+        scanner = LazyScanner(self.source[self.start : self.end], self.brace.line)
+        scanner.scan_tokens()
+        statements = LazyParser(scanner).block_statements()
+        if Lox.had_error:
+            raise LazyParseError("syntax error in block")
+        Lox.had_error = had_error
+
+        if Lox.type_inference:
+            from type_inference import Scope, TypeInference
+
+            scopes = None if self.context is None else [self.context, Scope()]
+            TypeInference(scopes).infer(statements)
+            self.context = None
+
+        if self.scopes is not None:
+            from resolver import Resolver
+
+            Resolver(self.scopes + [set()]).resolve(statements)
+            self.scopes = None
+
+        return statements
+
+
+class LazyParser(Parser):
+    closers = {
+        TokenType.LEFT_PAREN: TokenType.RIGHT_PAREN,
+        TokenType.LEFT_BRACKET: TokenType.RIGHT_BRACKET,
+        TokenType.LEFT_BRACE: TokenType.RIGHT_BRACE,
+    }
+
+    def __init__(self, scanner: LazyScanner) -> None:
+        super().__init__(scanner.tokens)
+        self.source = scanner.source
+        self.offsets = scanner.offsets
+        self.loops = 0
+
+    def for_statement(self) -> Stmt:
+        self.loops += 1
+        try:
+            return super().for_statement()
+        finally:
+            self.loops -= 1
+
+    def while_statement(self) -> Stmt:
+        self.loops += 1
+        try:
+            return super().while_statement()
+        finally:
+            self.loops -= 1
+
+    def block(self) -> Block:
+        if self.loops:
+            return super().block()
+
+        brace = self.previous()
+        start = self.offsets[self.current - 1] + 1
+        names = set()
+        identifiers = set()
+        expected = [TokenType.RIGHT_BRACE]
+
+        while expected:
+            if self.is_at_end():
+                raise self.error(self.peek(), "expect '}' after block")
+
+            token = self.peek()
+            if token.type in LazyParser.closers:
+                expected.append(LazyParser.closers[token.type])
+            elif token.type in LazyParser.closers.values():
+                closer = expected.pop()
+                if token.type != closer:
+                    raise self.error(token, f"expect {closer.value!r}")
+            elif token.type == TokenType.IDENTIFIER:
+                identifiers.add(token.lexeme)
+            elif token.type == TokenType.EQUAL:
+                target, keyword = self.previous(), self.tokens[self.current - 2]
+                if (
+                    target.type == TokenType.IDENTIFIER
+                    and keyword.type != TokenType.VAR
+                ):
+                    names.add(target.lexeme)
+            self.advance()
+
+        end = self.offsets[self.current - 1] + 1
+        return LazyBlock(brace, self.source, start, end, names, identifiers)
+
+    def block_statements(self) -> list[Stmt]:
+        try:
+            return super().block().statements
+        except ParseError:
+            return []
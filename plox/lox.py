@@ -1,33 +1,232 @@
+from __future__ import annotations
+import argparse
+import contextlib
+import json
+import os
 import sys
+import time
+from typing import TextIO, TYPE_CHECKING
 
-from errors import LoxRuntimeError
+from errors import LoxRuntimeError, SnapshotError
+from stats import Stats
+from stmt import Stmt
 from tokens import TokenType, Token
 
+if TYPE_CHECKING:
+    from lox_coverage import Coverage
+    from memprofile import MemoryProfiler
+    from profiler import SamplingProfiler
+    from snapshot import Snapshot
+
 
 class Lox:
     had_error = False
     had_runtime_error = False
+    stats: Stats | None = None
+    memory_profiler: MemoryProfiler | None = None
+    coverage: Coverage | None = None
+    snapshot: Snapshot | None = None
+    type_inference = True
+    lazy = False
+    jobs = 1
+    mmap = False
+    tier_threshold: int | None = 1000
+    tier_log: TextIO | None = None
 
     @staticmethod
     def main() -> None:
-        args = sys.argv[1:]
-        if len(args) > 1:
-            print("Usage: plox [script]")
-        elif len(args) == 1:
-            Lox.run_file(args[0])
+        argument_parser = argparse.ArgumentParser(prog="plox")
+        argument_parser.add_argument("script", nargs="?")
+        argument_parser.add_argument(
+            "-I",
+            "--include",
+            action="append",
+            default=[],
+            metavar="DIR",
+            help="add a directory to the module search path",
+        )
+        argument_parser.add_argument(
+            "--profile",
+            metavar="FILE",
+            help="write a sampled, collapsed-stack profile of the run to FILE",
+        )
+        argument_parser.add_argument(
+            "--profile-interval",
+            type=float,
+            default=5.0,
+            metavar="MS",
+            help="sampling interval for --profile in milliseconds",
+        )
+        argument_parser.add_argument(
+            "--stats",
+            action="store_true",
+            help="print runtime statistics as JSON to stderr when the run ends",
+        )
+        argument_parser.add_argument(
+            "--meter",
+            metavar="FILE",
+            help="write the work units the run performed to FILE as a cost profile",
+        )
+        argument_parser.add_argument(
+            "--memprofile",
+            action="store_true",
+            help="print the lines that allocated the most memory to stderr",
+        )
+        argument_parser.add_argument(
+            "--memory-limit",
+            type=int,
+            metavar="BYTES",
+            help="stop the run with a runtime error once it holds more memory",
+        )
+        argument_parser.add_argument(
+            "--coverage",
+            metavar="FILE",
+            help="record line and branch coverage of the script into FILE",
+        )
+        argument_parser.add_argument(
+            "--no-type-inference",
+            dest="type_inference",
+            action="store_false",
+            help="keep runtime operand checks on every operation",
+        )
+        argument_parser.add_argument(
+            "--watch",
+            action="store_true",
+            help="rerun the script every time it changes",
+        )
+        argument_parser.add_argument(
+            "-j",
+            "--jobs",
+            type=int,
+            default=1,
+            metavar="N",
+            help="scan and parse large scripts in N processes",
+        )
+        argument_parser.add_argument(
+            "--mmap",
+            action="store_true",
+            help="scan the script as bytes straight from a memory map",
+        )
+        argument_parser.add_argument(
+            "--lazy",
+            action="store_true",
+            help="parse block bodies only when they first run",
+        )
+        argument_parser.add_argument(
+            "--snapshot-save",
+            metavar="FILE",
+            help="save the globals to FILE when the script calls snapshot()",
+        )
+        argument_parser.add_argument(
+            "--snapshot-load",
+            metavar="FILE",
+            help="restore the globals from FILE and run on from its snapshot()",
+        )
+        argument_parser.add_argument(
+            "--tier-threshold",
+            type=int,
+            default=Lox.tier_threshold,
+            metavar="N",
+            help="compile a while loop once it ran N iterations (0 never compiles)",
+        )
+        argument_parser.add_argument(
+            "--trace-tiers",
+            action="store_true",
+            help="log loops that get compiled to stderr",
+        )
+        args = argument_parser.parse_args()
+        if args.watch and args.coverage is not None:
+            argument_parser.error("--watch can't be combined with --coverage")
+        snapshots = (args.snapshot_save, args.snapshot_load)
+        if snapshots != (None, None) and (args.script is None or args.watch):
+            argument_parser.error("snapshots need a script and can't be watched")
+
+        Lox.type_inference = args.type_inference
+        Lox.lazy = args.lazy
+        Lox.jobs = args.jobs
+        Lox.mmap = args.mmap
+        if args.tier_threshold <= 0 or args.profile is not None:
+            Lox.tier_threshold = None
+        else:
+            Lox.tier_threshold = args.tier_threshold
+        if args.trace_tiers:
+            Lox.tier_log = sys.stderr
+
+        from module_loader import ModuleLoader
+
+        ModuleLoader.search_path = args.include
+        if args.script is not None:
+            script_directory = os.path.dirname(args.script) or "."
+            ModuleLoader.search_path = [script_directory] + args.include
+
+        with contextlib.ExitStack() as stack:
+            if args.stats or args.meter is not None:
+                stats = Lox.stats = Stats()
+                if args.stats:
+                    stack.callback(
+                        lambda: print(json.dumps(stats.as_dict()), file=sys.stderr)
+                    )
+                if args.meter is not None:
+                    stack.callback(stats.save, args.meter)
+
+            if args.memprofile or args.memory_limit is not None:
+                from memprofile import MemoryProfiler
+
+                memory_profiler = Lox.memory_profiler = MemoryProfiler(
+                    args.memory_limit
+                )
+                if args.memprofile:
+                    stack.callback(lambda: memory_profiler.report(sys.stderr))
+                memory_profiler.start()
+                stack.callback(memory_profiler.stop)
+
+            if args.coverage is not None and args.script is not None:
+                from lox_coverage import Coverage
+
+                with open(args.script) as file:
+                    coverage = Lox.coverage = Coverage(args.script, file.read())
+                stack.callback(coverage.save, args.coverage)
+
+            if snapshots != (None, None):
+                from snapshot import Snapshot
+
+                Lox.snapshot = Snapshot(args.script, *snapshots)
+
+            if args.profile is not None:
+                from profiler import SamplingProfiler
+
+                profiler = SamplingProfiler(args.profile_interval / 1000)
+                stack.callback(Lox.write_profile, profiler, args.profile)
+                profiler.start()
+                stack.callback(profiler.stop)
+
+            if args.watch and args.script is not None:
+                Lox.watch(args.script)
+            else:
+                Lox.start(args.script)
+
+    @staticmethod
+    def write_profile(profiler: SamplingProfiler, path: str) -> None:
+        with open(path, "w") as file:
+            profiler.write(file)
+
+    @staticmethod
+    def start(script: str | None) -> None:
+        if script is not None:
+            Lox.run_file(script)
         else:
             Lox.run_prompt()
 
     @staticmethod
     def run_file(path: str) -> None:
-        with open(path) as file:
-            contents = file.read()
-            Lox.run(contents)
+        statements = Lox.parse_file(path)
+        if statements:
+            Lox.interpret(statements)
 
-            if Lox.had_error:
-                exit(65)
-            if Lox.had_runtime_error:
-                exit(70)
+        if Lox.had_error:
+            exit(65)
+        if Lox.had_runtime_error:
+            exit(70)
 
     @staticmethod
     def run_prompt() -> None:
@@ -43,25 +242,173 @@ class Lox:
             print("Bye...")
 
     @staticmethod
-    def run(source: str) -> None:
-        from scanner import Scanner
+    def watch(path: str) -> None:
+        from incremental import Document
+        from module_loader import ModuleLoader
 
-        scanner = Scanner(source)
-        tokens = scanner.scan_tokens()
+        document = None
+        modified = None
+        try:
+            while True:
+                stat = os.stat(path)
+                if stat.st_mtime_ns == modified:
+                    time.sleep(0.1)
+                    continue
+                modified = stat.st_mtime_ns
 
-        from parser import Parser
+                with open(path) as file:
+                    contents = file.read()
 
-        parser = Parser(tokens)
-        statements = parser.parse()
+                Lox.had_error = False
+                Lox.had_runtime_error = False
+                if document is None:
+                    document = Document(contents)
+                else:
+                    document.update(contents)
 
+                if not Lox.had_error:
+                    ModuleLoader.modules.clear()
+                    Lox.interpret(document.statements)
+                print(f"[watching {path}]", file=sys.stderr)
+        except KeyboardInterrupt:
+            print()
+
+    @staticmethod
+    def run(source: str) -> None:
+        statements = Lox.parse(source)
         if not statements:
             return
 
+        Lox.interpret(statements)
+
+    @staticmethod
+    def interpret(statements: list[Stmt]) -> None:
+        if Lox.coverage is not None:
+            Lox.coverage.instrument(statements)
+
         from interpreter import Interpreter
 
         interpreter = Interpreter()
+        if Lox.stats is not None:
+            interpreter.enable_stats(Lox.stats)
+        if Lox.memory_profiler is not None:
+            Lox.memory_profiler.attach(interpreter)
+        if Lox.snapshot is not None:
+            try:
+                statements = Lox.snapshot.attach(interpreter, statements)
+            except SnapshotError as error:
+                print(f"Error: {error}", file=sys.stderr)
+                Lox.had_error = True
+                return
         interpreter.interpret(statements)
 
+    @staticmethod
+    async def run_async(
+        source: str,
+        yield_every: int = 1000,
+        budget: int | None = None,
+        deadline: float | None = None,
+    ) -> None:
+        statements = Lox.parse(source)
+        if not statements:
+            return
+
+        from async_interpreter import AsyncInterpreter
+
+        interpreter = AsyncInterpreter(yield_every, budget, deadline)
+        await interpreter.interpret_async(statements)
+
+    @staticmethod
+    def parse(source: str) -> list[Stmt]:
+        from parallel import ParallelParser
+
+        statements = None
+        if Lox.jobs > 1 and not Lox.lazy and len(source) >= ParallelParser.threshold:
+            statements = Lox.parse_parallel(source)
+        if statements is None:
+            statements = Lox.parse_sequential(source)
+
+        Lox.infer(statements)
+        return statements
+
+    @staticmethod
+    def infer(statements: list[Stmt]) -> None:
+        if Lox.type_inference:
+            from type_inference import TypeInference
+
+            TypeInference().infer(statements)
+
+        from resolver import Resolver
+
+        Resolver().resolve(statements)
+
+    @staticmethod
+    def parse_file(path: str) -> list[Stmt]:
+        from byte_scanner import ByteScanner
+
+        mapped = Lox.mmap or os.path.getsize(path) >= ByteScanner.threshold
+        if mapped and not Lox.lazy and Lox.jobs == 1:
+            if Lox.memory_profiler is not None:
+                Lox.memory_profiler.enter("scan")
+
+            tokens = ByteScanner.scan_file(path)
+            if tokens is not None:
+                from parser import Parser
+
+                if Lox.stats is not None:
+                    Lox.stats.record_tokens(len(tokens))
+                if Lox.memory_profiler is not None:
+                    Lox.memory_profiler.enter("parse")
+
+                statements = Parser(tokens).parse()
+                Lox.infer(statements)
+                return statements
+
+        with open(path) as file:
+            return Lox.parse(file.read())
+
+    @staticmethod
+    def parse_parallel(source: str) -> list[Stmt] | None:
+        if Lox.memory_profiler is not None:
+            Lox.memory_profiler.enter("parse")
+
+        from parallel import ParallelParser
+
+        result = ParallelParser(Lox.jobs).parse(source)
+        if result is None:
+            return None
+
+        statements, tokens = result
+        if Lox.stats is not None:
+            Lox.stats.record_tokens(tokens)
+
+        return statements
+
+    @staticmethod
+    def parse_sequential(source: str) -> list[Stmt]:
+        if Lox.memory_profiler is not None:
+            Lox.memory_profiler.enter("scan")
+
+        from lazy_parser import LazyParser, LazyScanner
+        from scanner import Scanner
+
+        lazy = Lox.lazy and Lox.coverage is None
+        scanner = LazyScanner(source) if lazy else Scanner(source)
+        tokens = scanner.scan_tokens()
+
+        from parser import Parser
+
+        if Lox.stats is not None:
+            Lox.stats.record_tokens(len(tokens))
+        if Lox.memory_profiler is not None:
+            Lox.memory_profiler.enter("parse")
+
+        if isinstance(scanner, LazyScanner):
+            parser: Parser = LazyParser(scanner)
+        else:
+            parser = Parser(tokens)
+        return parser.parse()
+
     @staticmethod
     def error(line: int, message: str, token: Token | None = None) -> None:
         if token:
@@ -86,4 +433,6 @@ class Lox:
 
 
 if __name__ == "__main__":
-    Lox.main()
+    import lox
+
+    lox.Lox.main()
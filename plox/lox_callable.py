@@ -0,0 +1,18 @@
+from __future__ import annotations
+from abc import ABC, abstractmethod
+from typing import Any, TYPE_CHECKING
+
+from tokens import Token
+
+if TYPE_CHECKING:
+    from interpreter import Interpreter
+
+
+class LoxCallable(ABC):
+    @abstractmethod
+    def arity(self) -> int:
+        pass
+
+    @abstractmethod
+    def call(self, interpreter: Interpreter, arguments: list[Any], paren: Token) -> Any:
+        pass
@@ -0,0 +1,201 @@
+import argparse
+import fcntl
+import hashlib
+import json
+import os
+import sys
+from typing import Any, Callable, TextIO
+
+from expr import Expr
+from stmt import Block, If, Stmt, While
+
+
+class Coverage:
+    version = 1
+
+    def __init__(self, path: str, source: str) -> None:
+        self.path = os.path.realpath(path)
+        self.digest = hashlib.sha1(source.encode()).hexdigest()
+        self.lines: list[int] = []
+        self.branch_lines: list[int] = []
+        self.hits = bytearray()
+        self.branch_hits = bytearray()
+
+    def instrument(self, statements: list[Stmt]) -> None:
+        for statement in statements:
+            self.instrument_stmt(statement)
+
+    def instrument_stmt(self, stmt: Stmt) -> None:
+        node = len(self.lines)
+        self.lines.append(stmt.line)
+        self.hits.append(0)
+
+        hits = self.hits
+        accept = stmt.accept
+
+        def probe(visitor: Any) -> Any:
+            hits[node] = 1
+            return accept(visitor)
+
+        setattr(stmt, "accept", probe)
+
+        match stmt:
+            case Block():
+                self.instrument(stmt.statements)
+            case If():
+                self.instrument_branch(stmt.condition, stmt.line)
+                self.instrument_stmt(stmt.then_branch)
+                if stmt.else_branch is not None:
+                    self.instrument_stmt(stmt.else_branch)
+            case While():
+                self.instrument_branch(stmt.condition, stmt.line)
+                self.instrument_stmt(stmt.body)
+
+    def instrument_branch(self, condition: Expr, line: int) -> None:
+        branch = len(self.branch_lines)
+        self.branch_lines += [line, line]
+        self.branch_hits += bytes(2)
+
+        branch_hits = self.branch_hits
+        accept: Callable[[Any], Any] = condition.accept
+
+        def probe(visitor: Any) -> Any:
+            value = accept(visitor)
+            if value is None or value is False:
+                branch_hits[branch + 1] = 1
+            else:
+                branch_hits[branch] = 1
+            return value
+
+        setattr(condition, "accept", probe)
+
+    def save(self, data_path: str) -> None:
+        with open(data_path, "a+") as file:
+            fcntl.flock(file, fcntl.LOCK_EX)
+            file.seek(0)
+            contents = file.read()
+            data = json.loads(contents) if contents else {}
+            if data.get("version") != Coverage.version:
+                data = {"version": Coverage.version, "files": {}}
+
+            previous = data["files"].get(self.path)
+            hits = Coverage.pack(self.hits)
+            branch_hits = Coverage.pack(self.branch_hits)
+            if previous is not None and previous["digest"] == self.digest:
+                hits = Coverage.merge(previous["hits"], hits)
+                branch_hits = Coverage.merge(previous["branch_hits"], branch_hits)
+
+            data["files"][self.path] = {
+                "digest": self.digest,
+                "lines": self.lines,
+                "branch_lines": self.branch_lines,
+                "hits": hits,
+                "branch_hits": branch_hits,
+            }
+
+            file.seek(0)
+            file.truncate()
+            json.dump(data, file)
+
+    @staticmethod
+    def pack(hits: bytearray) -> str:
+        packed = bytearray((len(hits) + 7) // 8)
+        for index, hit in enumerate(hits):
+            if hit:
+                packed[index // 8] |= 1 << (index % 8)
+        return packed.hex()
+
+    @staticmethod
+    def unpack(packed: str, length: int) -> list[bool]:
+        bits = bytes.fromhex(packed)
+        return [bool(bits[index // 8] >> (index % 8) & 1) for index in range(length)]
+
+    @staticmethod
+    def merge(left: str, right: str) -> str:
+        merged = bytes(a | b for a, b in zip(bytes.fromhex(left), bytes.fromhex(right)))
+        return merged.hex()
+
+
+class CoverageReport:
+    @staticmethod
+    def main() -> None:
+        argument_parser = argparse.ArgumentParser(prog="plox-coverage")
+        argument_parser.add_argument("data", nargs="+", help="coverage data files")
+        argument_parser.add_argument(
+            "--lcov", metavar="FILE", help="also write an LCOV tracefile"
+        )
+        args = argument_parser.parse_args()
+
+        files: dict[str, Any] = {}
+        for data_path in args.data:
+            with open(data_path) as file:
+                data = json.load(file)
+            if data.get("version") != Coverage.version:
+                print(f"{data_path}: unsupported coverage data", file=sys.stderr)
+                exit(65)
+
+            for path, entry in data["files"].items():
+                previous = files.get(path)
+                if previous is not None and previous["digest"] == entry["digest"]:
+                    entry = dict(
+                        entry,
+                        hits=Coverage.merge(previous["hits"], entry["hits"]),
+                        branch_hits=Coverage.merge(
+                            previous["branch_hits"], entry["branch_hits"]
+                        ),
+                    )
+                files[path] = entry
+
+        CoverageReport.text(files, sys.stdout)
+        if args.lcov is not None:
+            with open(args.lcov, "w") as file:
+                CoverageReport.lcov(files, file)
+
+    @staticmethod
+    def line_hits(entry: dict[str, Any]) -> dict[int, bool]:
+        hits = Coverage.unpack(entry["hits"], len(entry["lines"]))
+        lines: dict[int, bool] = {}
+        for line, hit in zip(entry["lines"], hits):
+            lines[line + 1] = lines.get(line + 1, False) or hit
+        return lines
+
+    @staticmethod
+    def branch_hits(entry: dict[str, Any]) -> list[bool]:
+        return Coverage.unpack(entry["branch_hits"], len(entry["branch_lines"]))
+
+    @staticmethod
+    def text(files: dict[str, Any], out: TextIO) -> None:
+        for path, entry in sorted(files.items()):
+            lines = CoverageReport.line_hits(entry)
+            branches = CoverageReport.branch_hits(entry)
+            missing = ", ".join(
+                str(line) for line, hit in sorted(lines.items()) if not hit
+            )
+
+            out.write(
+                f"{path}: {sum(lines.values())}/{len(lines)} lines,"
+                f" {sum(branches)}/{len(branches)} branches\n"
+            )
+            if missing:
+                out.write(f"  missing lines: {missing}\n")
+
+    @staticmethod
+    def lcov(files: dict[str, Any], out: TextIO) -> None:
+        for path, entry in sorted(files.items()):
+            out.write(f"TN:\nSF:{path}\n")
+
+            branches = CoverageReport.branch_hits(entry)
+            for index, (line, hit) in enumerate(zip(entry["branch_lines"], branches)):
+                block, branch = divmod(index, 2)
+                out.write(f"BRDA:{line + 1},{block},{branch},{int(hit)}\n")
+            out.write(f"BRF:{len(branches)}\nBRH:{sum(branches)}\n")
+
+            lines = CoverageReport.line_hits(entry)
+            for line, hit in sorted(lines.items()):
+                out.write(f"DA:{line},{int(hit)}\n")
+            out.write(f"LF:{len(lines)}\nLH:{sum(lines.values())}\n")
+            out.write("end_of_record\n")
+
+
+if __name__ == "__main__":
+    CoverageReport.main()
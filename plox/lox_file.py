@@ -0,0 +1,53 @@
+from typing import Any, TextIO
+
+from errors import LoxRuntimeError
+from tokens import Token
+
+
+class LoxFile:
+    __slots__ = ("name", "file", "standard")
+
+    def __init__(self, name: str, file: TextIO, standard: bool = False) -> None:
+        self.name = name
+        self.file = file
+        self.standard = standard
+
+    def readline(self, paren: Token) -> Any:
+        try:
+            line = self.file.readline()
+        except (OSError, ValueError) as error:
+            raise LoxRuntimeError(paren, self.reason(error)) from None
+
+        if not line:
+            return None
+        return line[:-1] if line[-1] == "\n" else line
+
+    def read(self, paren: Token, size: int) -> Any:
+        try:
+            chunk = self.file.read(size)
+        except (OSError, ValueError) as error:
+            raise LoxRuntimeError(paren, self.reason(error)) from None
+
+        return chunk or None
+
+    def write(self, paren: Token, text: str) -> None:
+        try:
+            self.file.write(text)
+        except (OSError, ValueError) as error:
+            raise LoxRuntimeError(paren, self.reason(error)) from None
+
+    def close(self) -> None:
+        if self.standard:
+            self.file.flush()
+        else:
+            self.file.close()
+
+    def reason(self, error: Exception) -> str:
+        if self.file.closed:
+            return f"file {self.name!r} is closed"
+        if isinstance(error, OSError) and error.strerror:
+            return f"can't access {self.name!r}: {error.strerror}"
+        return f"can't access {self.name!r}: {error}"
+
+    def __str__(self) -> str:
+        return f"<file {self.name}>"
@@ -0,0 +1,39 @@
+from typing import Any
+
+from errors import LoxRuntimeError
+from tokens import Token
+
+
+class LoxList:
+    __slots__ = ("elements",)
+
+    def __init__(self, elements: list[Any] | None = None) -> None:
+        self.elements = elements if elements is not None else []
+
+    def get(self, bracket: Token, index: Any) -> Any:
+        return self.elements[self.position(bracket, index)]
+
+    def set(self, bracket: Token, index: Any, value: Any) -> None:
+        self.elements[self.position(bracket, index)] = value
+
+    def append(self, value: Any) -> None:
+        self.elements.append(value)
+
+    def pop(self, paren: Token) -> Any:
+        if not self.elements:
+            raise LoxRuntimeError(paren, "can't pop from an empty list")
+
+        return self.elements.pop()
+
+    def position(self, bracket: Token, index: Any) -> int:
+        if not isinstance(index, float) or not index.is_integer():
+            raise LoxRuntimeError(bracket, "list index must be an integer")
+
+        position = int(index)
+        if position < 0 or position >= len(self.elements):
+            raise LoxRuntimeError(bracket, "list index out of range")
+
+        return position
+
+    def __len__(self) -> int:
+        return len(self.elements)
@@ -0,0 +1,32 @@
+from typing import Any
+
+from errors import LoxRuntimeError
+from tokens import Token
+
+
+class LoxMap:
+    __slots__ = ("entries",)
+
+    def __init__(self, entries: dict[Any, Any] | None = None) -> None:
+        self.entries = entries if entries is not None else {}
+
+    def get(self, bracket: Token, key: Any) -> Any:
+        try:
+            return self.entries[key]
+        except KeyError:
+            raise LoxRuntimeError(bracket, "undefined key") from None
+
+    def set(self, key: Any, value: Any) -> None:
+        self.entries[key] = value
+
+    def has(self, key: Any) -> bool:
+        return key in self.entries
+
+    def remove(self, paren: Token, key: Any) -> Any:
+        try:
+            return self.entries.pop(key)
+        except KeyError:
+            raise LoxRuntimeError(paren, "undefined key") from None
+
+    def __len__(self) -> int:
+        return len(self.entries)
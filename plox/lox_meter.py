@@ -0,0 +1,73 @@
+import argparse
+import json
+import sys
+from typing import TextIO
+
+from stats import Stats
+
+
+class MeterReport:
+    @staticmethod
+    def main() -> None:
+        argument_parser = argparse.ArgumentParser(prog="plox-meter")
+        argument_parser.add_argument("baseline", help="the checked-in cost profile")
+        argument_parser.add_argument("profile", help="the cost profile of this run")
+        argument_parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.0,
+            metavar="PERCENT",
+            help="allow counters to grow by up to PERCENT",
+        )
+        args = argument_parser.parse_args()
+
+        baseline = MeterReport.load(args.baseline)
+        profile = MeterReport.load(args.profile)
+
+        regressions = MeterReport.compare(baseline, profile, args.tolerance, sys.stdout)
+        if regressions:
+            print(f"{regressions} counters regressed", file=sys.stderr)
+            exit(1)
+
+    @staticmethod
+    def load(path: str) -> dict[str, int]:
+        try:
+            with open(path) as file:
+                data = json.load(file)
+        except (OSError, ValueError) as error:
+            print(f"{path}: can't read cost profile: {error}", file=sys.stderr)
+            exit(65)
+
+        if not isinstance(data, dict) or data.get("version") != Stats.version:
+            print(f"{path}: unsupported cost profile", file=sys.stderr)
+            exit(65)
+
+        counters: dict[str, int] = data["counters"]
+        return counters
+
+    @staticmethod
+    def compare(
+        baseline: dict[str, int],
+        profile: dict[str, int],
+        tolerance: float,
+        out: TextIO,
+    ) -> int:
+        regressions = 0
+        for name in sorted(baseline.keys() | profile.keys()):
+            before = baseline.get(name, 0)
+            after = profile.get(name, 0)
+            if before == after:
+                continue
+
+            change = (after - before) / before * 100 if before else float("inf")
+            regressed = after > before and change > tolerance
+            regressions += regressed
+
+            verdict = "regressed" if regressed else "changed"
+            out.write(f"{name}: {before} -> {after} ({change:+.1f}%) {verdict}\n")
+
+        return regressions
+
+
+if __name__ == "__main__":
+    MeterReport.main()
@@ -0,0 +1,57 @@
+import tracemalloc
+from collections import Counter
+from typing import Any, TextIO
+
+from environment import Environment
+from errors import LoxRuntimeError
+from interpreter import Interpreter
+from stmt import Stmt
+from tokens import Token, TokenType
+
+
+class MemoryProfiler:
+    def __init__(self, limit: int | None = None) -> None:
+        self.limit = limit
+        self.peak: Counter[str] = Counter()
+        self.retained: Counter[str] = Counter()
+
+        self.label: str | None = None
+        self.current = 0
+
+    def start(self) -> None:
+        tracemalloc.start()
+
+    def stop(self) -> None:
+        self.enter(None)
+        tracemalloc.stop()
+
+    def attach(self, interpreter: Interpreter) -> None:
+        interpreter.add_hook(self.hook)
+
+    def hook(self, event: str, stmt: Stmt, environment: Environment, arg: Any) -> None:
+        if event != "statement":
+            return
+
+        self.enter(f"line {stmt.line}")
+        if self.limit is not None and self.current > self.limit:
+            token = Token(TokenType.EOF, "", None, stmt.line)
+            raise LoxRuntimeError(token, f"memory limit of {self.limit} bytes exceeded")
+
+    def enter(self, label: str | None) -> None:
+        current, peak = tracemalloc.get_traced_memory()
+        if self.label is not None:
+            self.retained[self.label] += current - self.current
+            self.peak[self.label] = max(self.peak[self.label], peak - self.current)
+
+        tracemalloc.reset_peak()
+        self.label = label
+        self.current = current
+
+    def report(self, file: TextIO, count: int = 10) -> None:
+        for title, table in (("peak", self.peak), ("retained", self.retained)):
+            file.write(f"top {count} by {title} bytes:\n")
+            file.write(f"  {'where':<12} {'peak':>14} {'retained':>14}\n")
+            for label, _ in table.most_common(count):
+                peak = self.peak[label]
+                retained = self.retained[label]
+                file.write(f"  {label:<12} {peak:>14,} {retained:>14,}\n")
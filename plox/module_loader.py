@@ -0,0 +1,89 @@
+import os
+from typing import Any
+
+from environment import GlobalEnvironment
+from errors import LoxRuntimeError
+from lox import Lox
+from natives import NativeFunction
+from tokens import Token
+
+
+class Module:
+    def __init__(self, path: str, environment: GlobalEnvironment) -> None:
+        self.path = path
+        self.environment = environment
+
+    def exports(self) -> dict[str, Any]:
+        return {
+            name: value
+            for name, value in self.environment.values.items()
+            if not isinstance(value, NativeFunction)
+        }
+
+
+class ModuleLoader:
+    search_path: list[str] = []
+    modules: dict[str, Module] = {}
+    loading: list[str] = []
+
+    @staticmethod
+    def load(keyword: Token, path: str, directory: str | None) -> Module:
+        resolved = ModuleLoader.resolve(keyword, path, directory)
+
+        module = ModuleLoader.modules.get(resolved)
+        if module is not None:
+            return module
+
+        if resolved in ModuleLoader.loading:
+            cycle = ModuleLoader.loading[ModuleLoader.loading.index(resolved) :]
+            chain = " -> ".join(os.path.basename(entry) for entry in cycle + [resolved])
+            raise LoxRuntimeError(keyword, f"import cycle {chain}")
+
+        ModuleLoader.loading.append(resolved)
+        try:
+            module = ModuleLoader.execute(keyword, resolved)
+        finally:
+            ModuleLoader.loading.pop()
+
+        ModuleLoader.modules[resolved] = module
+        return module
+
+    @staticmethod
+    def resolve(keyword: Token, path: str, directory: str | None) -> str:
+        candidates = [path]
+        if not os.path.isabs(path):
+            directories = ModuleLoader.search_path
+            if directory is not None:
+                directories = [directory] + directories
+            candidates = [os.path.join(entry, path) for entry in directories]
+            candidates.append(path)
+
+        for candidate in candidates:
+            if os.path.isfile(candidate):
+                return os.path.realpath(candidate)
+
+        raise LoxRuntimeError(keyword, f"module {path!r} not found")
+
+    @staticmethod
+    def execute(keyword: Token, path: str) -> Module:
+        with open(path) as file:
+            contents = file.read()
+
+        had_error = Lox.had_error
+        Lox.had_error = False
+
+        statements = Lox.parse(contents)
+
+        if Lox.had_error:
+            raise LoxRuntimeError(keyword, f"could not compile module {path!r}")
+        Lox.had_error = had_error
+
+        from interpreter import Interpreter
+
+        interpreter = Interpreter(os.path.dirname(path))
+        if Lox.stats is not None:
+            interpreter.enable_stats(Lox.stats)
+        for statement in statements:
+            interpreter.execute(statement)
+
+        return Module(path, interpreter.globals)
@@ -0,0 +1,191 @@
+from __future__ import annotations
+import sys
+import time
+from typing import Any, Callable, TYPE_CHECKING
+
+from environment import Environment
+from errors import LoxRuntimeError
+from lox_callable import LoxCallable
+from lox_file import LoxFile
+from lox_list import LoxList
+from lox_map import LoxMap
+from tokens import Token
+
+if TYPE_CHECKING:
+    from interpreter import Interpreter
+
+
+class NativeFunction(LoxCallable):
+    def __init__(
+        self, name: str, arity: int, function: Callable[[list[Any], Token], Any]
+    ) -> None:
+        self.name = name
+        self.function = function
+        self._arity = arity
+
+    def arity(self) -> int:
+        return self._arity
+
+    def call(self, interpreter: Interpreter, arguments: list[Any], paren: Token) -> Any:
+        return self.function(arguments, paren)
+
+    def __str__(self) -> str:
+        return "<native fn>"
+
+
+class Natives:
+    @staticmethod
+    def define(environment: Environment) -> None:
+        for name, arity, function in (
+            ("clock", 0, Natives.clock),
+            ("len", 1, Natives.len),
+            ("append", 2, Natives.append),
+            ("pop", 1, Natives.pop),
+            ("keys", 1, Natives.keys),
+            ("values", 1, Natives.values),
+            ("has", 2, Natives.has),
+            ("remove", 2, Natives.remove),
+            ("snapshot", 0, Natives.snapshot),
+            ("pmap", 2, Natives.pmap),
+            ("open", 2, Natives.open),
+            ("stdin", 0, Natives.stdin),
+            ("stdout", 0, Natives.stdout),
+            ("readline", 1, Natives.readline),
+            ("read", 2, Natives.read),
+            ("write", 2, Natives.write),
+            ("writeline", 2, Natives.writeline),
+            ("close", 1, Natives.close),
+        ):
+            environment.define(name, NativeFunction(name, arity, function))
+
+    @staticmethod
+    def clock(arguments: list[Any], paren: Token) -> Any:
+        return time.time()
+
+    @staticmethod
+    def len(arguments: list[Any], paren: Token) -> Any:
+        value = arguments[0]
+        if isinstance(value, (LoxList, LoxMap, str)):
+            return float(len(value))
+
+        raise LoxRuntimeError(paren, "argument must be a list, a map or a string")
+
+    @staticmethod
+    def append(arguments: list[Any], paren: Token) -> Any:
+        Natives.list_argument(arguments[0], paren).append(arguments[1])
+        return None
+
+    @staticmethod
+    def pop(arguments: list[Any], paren: Token) -> Any:
+        return Natives.list_argument(arguments[0], paren).pop(paren)
+
+    @staticmethod
+    def keys(arguments: list[Any], paren: Token) -> Any:
+        return LoxList(list(Natives.map_argument(arguments[0], paren).entries))
+
+    @staticmethod
+    def values(arguments: list[Any], paren: Token) -> Any:
+        entries = Natives.map_argument(arguments[0], paren).entries
+        return LoxList(list(entries.values()))
+
+    @staticmethod
+    def has(arguments: list[Any], paren: Token) -> Any:
+        return Natives.map_argument(arguments[0], paren).has(arguments[1])
+
+    @staticmethod
+    def remove(arguments: list[Any], paren: Token) -> Any:
+        return Natives.map_argument(arguments[0], paren).remove(paren, arguments[1])
+
+    @staticmethod
+    def snapshot(arguments: list[Any], paren: Token) -> Any:
+        return None
+
+    @staticmethod
+    def pmap(arguments: list[Any], paren: Token) -> Any:
+        path, inputs = arguments
+        if not isinstance(path, str):
+            raise LoxRuntimeError(paren, "argument must be a path")
+
+        from parallel_map import ParallelMap
+
+        elements = Natives.list_argument(inputs, paren).elements
+        return LoxList(ParallelMap(paren, path).map(list(elements)))
+
+    @staticmethod
+    def open(arguments: list[Any], paren: Token) -> Any:
+        path, mode = arguments
+        if not isinstance(path, str):
+            raise LoxRuntimeError(paren, "argument must be a path")
+        if mode not in ("r", "w", "a"):
+            raise LoxRuntimeError(paren, 'mode must be "r", "w" or "a"')
+
+        try:
+            return LoxFile(path, open(path, mode, encoding="utf-8"))
+        except OSError as error:
+            raise LoxRuntimeError(
+                paren, f"can't open {path!r}: {error.strerror}"
+            ) from None
+
+    @staticmethod
+    def stdin(arguments: list[Any], paren: Token) -> Any:
+        return LoxFile("<stdin>", sys.stdin, True)
+
+    @staticmethod
+    def stdout(arguments: list[Any], paren: Token) -> Any:
+        return LoxFile("<stdout>", sys.stdout, True)
+
+    @staticmethod
+    def readline(arguments: list[Any], paren: Token) -> Any:
+        return Natives.file_argument(arguments[0], paren).readline(paren)
+
+    @staticmethod
+    def read(arguments: list[Any], paren: Token) -> Any:
+        size = arguments[1]
+        if not isinstance(size, float) or not size.is_integer() or size < 1:
+            raise LoxRuntimeError(paren, "size must be a positive integer")
+
+        return Natives.file_argument(arguments[0], paren).read(paren, int(size))
+
+    @staticmethod
+    def write(arguments: list[Any], paren: Token) -> Any:
+        text = arguments[1]
+        if not isinstance(text, str):
+            raise LoxRuntimeError(paren, "argument must be a string")
+
+        Natives.file_argument(arguments[0], paren).write(paren, text)
+        return None
+
+    @staticmethod
+    def writeline(arguments: list[Any], paren: Token) -> Any:
+        text = arguments[1]
+        if not isinstance(text, str):
+            raise LoxRuntimeError(paren, "argument must be a string")
+
+        Natives.file_argument(arguments[0], paren).write(paren, text + "\n")
+        return None
+
+    @staticmethod
+    def close(arguments: list[Any], paren: Token) -> Any:
+        Natives.file_argument(arguments[0], paren).close()
+        return None
+
+    @staticmethod
+    def list_argument(value: Any, paren: Token) -> LoxList:
+        if isinstance(value, LoxList):
+            return value
+
+        raise LoxRuntimeError(paren, "argument must be a list")
+
+    @staticmethod
+    def map_argument(value: Any, paren: Token) -> LoxMap:
+        if isinstance(value, LoxMap):
+            return value
+
+        raise LoxRuntimeError(paren, "argument must be a map")
+
+    @staticmethod
+    def file_argument(value: Any, paren: Token) -> LoxFile:
+        if isinstance(value, LoxFile):
+            return value
+
+        raise LoxRuntimeError(paren, "argument must be a file")
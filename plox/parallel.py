@@ -0,0 +1,91 @@
+import contextlib
+import io
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+from lox import Lox
+from parser import Parser
+from scanner import Scanner
+from stmt import Stmt
+
+
+class ParallelParser:
+    threshold = 1 << 20
+    chunks_per_job = 4
+
+    boundary = re.compile(r'"[^"]*"?|[(\[{]|[)\]}]|;')
+    followed_by_else = re.compile(r"[ \r\t\n]*else(?!\w)")
+
+    def __init__(self, jobs: int | None = None) -> None:
+        self.jobs = jobs or os.cpu_count() or 1
+
+    def parse(self, source: str) -> tuple[list[Stmt], int] | None:
+        splits = self.split(source)
+        if splits is None:
+            return None
+
+        chunks = []
+        lines = []
+        line = 0
+        previous = 0
+        for split in splits:
+            line += source.count("\n", previous, split[0])
+            chunks.append(source[split[0] : split[1]])
+            lines.append(line)
+            previous = split[0]
+
+        with ProcessPoolExecutor(self.jobs) as executor:
+            results = list(executor.map(ParallelParser.parse_chunk, chunks, lines))
+
+        statements: list[Stmt] = []
+        tokens = 1
+        for chunk_statements, chunk_tokens, had_error in results:
+            if had_error:
+                return None
+            statements += chunk_statements
+            tokens += chunk_tokens
+
+        return statements, tokens
+
+    def split(self, source: str) -> list[tuple[int, int]] | None:
+        size = max(len(source) // (self.jobs * ParallelParser.chunks_per_job), 1)
+
+        splits = []
+        start = 0
+        depth = 0
+        for match in ParallelParser.boundary.finditer(source):
+            text = match.group()
+            if text[0] == '"':
+                if len(text) == 1 or text[-1] != '"':
+                    return None
+            elif text in "([{":
+                depth += 1
+            elif text in ")]}":
+                depth -= 1
+                if depth < 0:
+                    return None
+            elif text == ";" and depth == 0:
+                end = match.end()
+                if end - start >= size and not ParallelParser.followed_by_else.match(
+                    source, end
+                ):
+                    splits.append((start, end))
+                    start = end
+
+        if depth != 0:
+            return None
+
+        splits.append((start, len(source)))
+        return splits
+
+    @staticmethod
+    def parse_chunk(chunk: str, line: int) -> tuple[list[Stmt], int, bool]:
+        Lox.had_error = False
+        with contextlib.redirect_stdout(io.StringIO()):
+            scanner = Scanner(chunk)
+            scanner.line = line
+            tokens = scanner.scan_tokens()
+            statements = Parser(tokens).parse()
+
+        return statements, len(tokens) - 1, Lox.had_error
@@ -0,0 +1,129 @@
+import contextlib
+import io
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+from errors import LoxRuntimeError, ParseError, SerializationError
+from lox import Lox
+from lox_list import LoxList
+from module_loader import ModuleLoader
+from natives import NativeFunction
+from program import Program
+from serializer import Serializer
+from tokens import Token
+
+Failure = tuple[int, int, str]
+
+
+class ParallelMap:
+    chunks_per_job = 4
+
+    pools: dict[str, tuple[int, ProcessPoolExecutor]] = {}
+    program: Program | None = None
+
+    def __init__(self, keyword: Token, path: str, jobs: int | None = None) -> None:
+        self.keyword = keyword
+        self.path = ModuleLoader.resolve(keyword, path, None)
+        self.jobs = jobs or (Lox.jobs if Lox.jobs > 1 else os.cpu_count() or 1)
+
+    def map(self, inputs: list[Any]) -> list[Any]:
+        if ParallelMap.program is not None:
+            program = ParallelMap.compile(self.keyword, self.path)
+            return [program.evaluate({"input": value}) for value in inputs]
+
+        executor = self.executor()
+        serializer = Serializer(ParallelMap.natives(None))
+
+        size = -(-len(inputs) // (self.jobs * ParallelMap.chunks_per_job)) or 1
+        try:
+            payloads = [
+                serializer.dumps(LoxList(inputs[start : start + size]))
+                for start in range(0, len(inputs), size)
+            ]
+            chunks = executor.map(ParallelMap.run, payloads)
+
+            results: list[Any] = []
+            for payload, output, failure in chunks:
+                sys.stdout.write(output)
+                if failure is not None:
+                    self.fail(failure, len(results))
+                results += serializer.loads(payload).elements
+        except SerializationError as error:
+            raise LoxRuntimeError(self.keyword, f"can't copy value: {error}") from None
+
+        return results
+
+    def fail(self, failure: Failure, offset: int) -> None:
+        position, line, message = failure
+        token = Token(self.keyword.type, self.keyword.lexeme, None, line)
+        name = os.path.basename(self.path)
+        raise LoxRuntimeError(
+            token, f"{message} in {name} for input {offset + position}"
+        )
+
+    def executor(self) -> ProcessPoolExecutor:
+        modified = os.stat(self.path).st_mtime_ns
+
+        pool = ParallelMap.pools.get(self.path)
+        if pool is not None and pool[0] == modified:
+            return pool[1]
+
+        ParallelMap.compile(self.keyword, self.path)
+        sys.stdout.flush()
+
+        executor = ProcessPoolExecutor(
+            self.jobs, initializer=ParallelMap.initialize, initargs=(self.path,)
+        )
+        if pool is not None:
+            pool[1].shutdown(wait=False)
+        ParallelMap.pools[self.path] = (modified, executor)
+        return executor
+
+    @staticmethod
+    def compile(keyword: Token, path: str) -> Program:
+        with open(path) as file:
+            source = file.read()
+
+        try:
+            return Program(source)
+        except ParseError:
+            raise LoxRuntimeError(keyword, f"could not compile {path!r}") from None
+
+    @staticmethod
+    def natives(program: Program | None) -> dict[str, NativeFunction]:
+        from interpreter import Interpreter
+
+        interpreter = program.interpreter if program is not None else Interpreter()
+        return {
+            name: value
+            for name, value in interpreter.globals.values.items()
+            if isinstance(value, NativeFunction)
+        }
+
+    @staticmethod
+    def initialize(path: str) -> None:
+        with open(path) as file:
+            ParallelMap.program = Program(file.read())
+
+    @staticmethod
+    def run(payload: bytes) -> tuple[bytes, str, Failure | None]:
+        program = ParallelMap.program
+        assert program is not None
+
+        serializer = Serializer(ParallelMap.natives(program))
+        inputs = serializer.loads(payload)
+
+        results = []
+        failure = None
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            for position, value in enumerate(inputs.elements):
+                try:
+                    results.append(program.evaluate({"input": value}))
+                except LoxRuntimeError as error:
+                    failure = (position, error.token.line, error.message)
+                    break
+
+        return serializer.dumps(LoxList(results)), output.getvalue(), failure
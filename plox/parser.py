@@ -1,7 +1,21 @@
 from errors import ParseError
-from expr import Assign, Binary, Expr, Grouping, Literal, Logical, Unary, Variable
+from expr import (
+    Assign,
+    Binary,
+    Call,
+    Expr,
+    Grouping,
+    Index,
+    ListLiteral,
+    Literal,
+    Logical,
+    MapLiteral,
+    SetIndex,
+    Unary,
+    Variable,
+)
 from lox import Lox
-from stmt import Block, Expression, If, Print, Stmt, Var, While
+from stmt import Block, Expression, If, Import, Print, Stmt, Var, While
 from tokens import Token, TokenType
 
 
@@ -24,8 +38,9 @@ class Parser:
 
     def declaration(self) -> Stmt | None:
         try:
+            line = self.peek().line
             if self.match(TokenType.VAR):
-                return self.var_declaration()
+                return self.at_line(self.var_declaration(), line)
 
             return self.statement()
         except ParseError:
@@ -33,28 +48,32 @@ class Parser:
             return None
 
     def statement(self) -> Stmt:
+        line = self.peek().line
         if self.match(TokenType.FOR):
-            return self.for_statement()
+            return self.at_line(self.for_statement(), line)
         if self.match(TokenType.IF):
-            return self.if_statement()
+            return self.at_line(self.if_statement(), line)
+        if self.match(TokenType.IMPORT):
+            return self.at_line(self.import_statement(), line)
         if self.match(TokenType.PRINT):
-            return self.print_statement()
+            return self.at_line(self.print_statement(), line)
         if self.match(TokenType.WHILE):
-            return self.while_statement()
+            return self.at_line(self.while_statement(), line)
         if self.match(TokenType.LEFT_BRACE):
-            return self.block()
+            return self.at_line(self.block(), line)
 
-        return self.expression_statement()
+        return self.at_line(self.expression_statement(), line)
 
     def for_statement(self) -> Stmt:
+        line = self.previous().line
         self.consume(TokenType.LEFT_PAREN, "expect '(' after 'for'")
 
         if self.match(TokenType.SEMICOLON):
             initializer = None
         elif self.match(TokenType.VAR):
-            initializer = self.var_declaration()
+            initializer = self.at_line(self.var_declaration(), line)
         else:
-            initializer = self.expression_statement()
+            initializer = self.at_line(self.expression_statement(), line)
 
         condition = None
         if not self.check(TokenType.SEMICOLON):
@@ -68,14 +87,16 @@ class Parser:
         body = self.statement()
 
         if increment:
-            body = Block([body, Expression(increment)])
+            body = self.at_line(
+                Block([body, self.at_line(Expression(increment), line)]), line
+            )
 
         if condition is None:
             condition = Literal(True)
-        body = While(condition, body)
+        body = self.at_line(While(condition, body), line)
 
         if initializer:
-            body = Block([initializer, body])
+            body = self.at_line(Block([initializer, body]), line)
 
         return body
 
@@ -91,6 +112,12 @@ class Parser:
 
         return If(condition, then_branch, else_branch)
 
+    def import_statement(self) -> Stmt:
+        keyword = self.previous()
+        path = self.consume(TokenType.STRING, "expect module path after 'import'")
+        self.consume(TokenType.SEMICOLON, "expect ';' after module path")
+        return Import(keyword, path)
+
     def print_statement(self) -> Stmt:
         value = self.expression()
         self.consume(TokenType.SEMICOLON, "expect ';' after value")
@@ -140,6 +167,8 @@ class Parser:
             if isinstance(expr, Variable):
                 name = expr.name
                 return Assign(name, value)
+            if isinstance(expr, Index):
+                return SetIndex(expr.object, expr.bracket, expr.index, value)
 
             self.error(equals, "invalid assignment target")
 
@@ -216,7 +245,36 @@ class Parser:
             right = self.unary()
             return Unary(operator, right)
 
-        return self.primary()
+        return self.call()
+
+    def call(self) -> Expr:
+        expr = self.primary()
+
+        while True:
+            if self.match(TokenType.LEFT_PAREN):
+                expr = self.finish_call(expr)
+            elif self.match(TokenType.LEFT_BRACKET):
+                bracket = self.previous()
+                index = self.expression()
+                self.consume(TokenType.RIGHT_BRACKET, "expect ']' after index")
+                expr = Index(expr, bracket, index)
+            else:
+                break
+
+        return expr
+
+    def finish_call(self, callee: Expr) -> Expr:
+        arguments = []
+        if not self.check(TokenType.RIGHT_PAREN):
+            arguments.append(self.expression())
+            while self.match(TokenType.COMMA):
+                if len(arguments) >= 255:
+                    self.error(self.peek(), "can't have more than 255 arguments")
+                arguments.append(self.expression())
+
+        paren = self.consume(TokenType.RIGHT_PAREN, "expect ')' after arguments")
+
+        return Call(callee, paren, arguments)
 
     def primary(self) -> Expr:
         if self.match(TokenType.FALSE):
@@ -237,8 +295,43 @@ class Parser:
             self.consume(TokenType.RIGHT_PAREN, "expect ')' after expression")
             return Grouping(expr)
 
+        if self.match(TokenType.LEFT_BRACKET):
+            return self.list_literal()
+        if self.match(TokenType.LEFT_BRACE):
+            return self.map_literal()
+
         raise self.error(self.peek(), "expect expression")
 
+    def list_literal(self) -> Expr:
+        bracket = self.previous()
+        elements = []
+        if not self.check(TokenType.RIGHT_BRACKET):
+            elements.append(self.expression())
+            while self.match(TokenType.COMMA):
+                elements.append(self.expression())
+
+        self.consume(TokenType.RIGHT_BRACKET, "expect ']' after list elements")
+        return ListLiteral(bracket, elements)
+
+    def map_literal(self) -> Expr:
+        brace = self.previous()
+        keys = []
+        values = []
+        if not self.check(TokenType.RIGHT_BRACE):
+            while True:
+                keys.append(self.expression())
+                self.consume(TokenType.COLON, "expect ':' after map key")
+                values.append(self.expression())
+                if not self.match(TokenType.COMMA):
+                    break
+
+        self.consume(TokenType.RIGHT_BRACE, "expect '}' after map entries")
+        return MapLiteral(brace, keys, values)
+
+    def at_line(self, statement: Stmt, line: int) -> Stmt:
+        statement.line = line
+        return statement
+
     def match(self, *types: TokenType) -> bool:
         for type in types:
             if self.check(type):
@@ -291,6 +384,7 @@ class Parser:
                 TokenType.VAR,
                 TokenType.FOR,
                 TokenType.IF,
+                TokenType.IMPORT,
                 TokenType.WHILE,
                 TokenType.PRINT,
                 TokenType.RETURN,
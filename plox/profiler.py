@@ -0,0 +1,52 @@
+import signal
+from collections import Counter
+from types import FrameType
+from typing import Any, TextIO
+
+from async_interpreter import AsyncInterpreter
+from interpreter import Interpreter
+
+
+class SamplingProfiler:
+    execute_codes = (
+        Interpreter.execute.__code__,
+        Interpreter.execute_hooked.__code__,
+        AsyncInterpreter.execute_async.__code__,
+    )
+    call_code = Interpreter.visit_call_expr.__code__
+
+    def __init__(self, interval: float = 0.005) -> None:
+        self.interval = interval
+        self.samples: Counter[tuple[str, ...]] = Counter()
+        self.previous_handler: Any = None
+
+    def start(self) -> None:
+        self.previous_handler = signal.signal(signal.SIGPROF, self.sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+
+    def stop(self) -> None:
+        signal.setitimer(signal.ITIMER_PROF, 0)
+        signal.signal(signal.SIGPROF, self.previous_handler)
+
+    def sample(self, signum: int, frame: FrameType | None) -> None:
+        stack = []
+        previous = None
+        while frame is not None:
+            code = frame.f_code
+            if code in SamplingProfiler.execute_codes:
+                stmt = frame.f_locals["stmt"]
+                if stmt is not previous:
+                    stack.append(f"{type(stmt).__name__.lower()} (line {stmt.line})")
+                previous = stmt
+            elif code is SamplingProfiler.call_code:
+                expr = frame.f_locals["expr"]
+                stack.append(f"call (line {expr.paren.line})")
+            frame = frame.f_back
+
+        if stack:
+            stack.reverse()
+            self.samples[tuple(stack)] += 1
+
+    def write(self, file: TextIO) -> None:
+        for stack, count in sorted(self.samples.items()):
+            file.write(f"{';'.join(stack)} {count}\n")
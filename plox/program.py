@@ -0,0 +1,85 @@
+from typing import Any, Iterable, Mapping, Sequence
+
+from environment import Environment
+from errors import ParseError
+from expr import Expr
+from interpreter import Interpreter
+from lox import Lox
+from parser import Parser
+from scanner import Scanner
+from stmt import Expression, Stmt
+from tokens import TokenType
+
+
+class Program:
+    def __init__(self, source: str) -> None:
+        self.statements: list[Stmt] = []
+        self.expression: Expr | None = None
+
+        had_error = Lox.had_error
+        Lox.had_error = False
+        try:
+            self.compile(source)
+            if Lox.had_error:
+                raise ParseError("could not compile program")
+        finally:
+            Lox.had_error = had_error
+
+        self.interpreter = Interpreter()
+        self.bindings = Environment(self.interpreter.globals)
+
+    def compile(self, source: str) -> None:
+        tokens = Scanner(source).scan_tokens()
+        parser = Parser(tokens)
+
+        if len(tokens) > 1 and tokens[-2].type not in (
+            TokenType.SEMICOLON,
+            TokenType.RIGHT_BRACE,
+        ):
+            self.expression = parser.expression()
+            if not parser.is_at_end():
+                raise parser.error(parser.peek(), "expect end of expression")
+            return
+
+        self.statements = parser.parse()
+        last = self.statements[-1] if self.statements else None
+        if isinstance(last, Expression):
+            self.statements.pop()
+            self.expression = last.expression
+
+    def evaluate(self, record: Mapping[str, Any]) -> Any:
+        return self.evaluate_batch((record,))[0]
+
+    def evaluate_batch(self, records: Iterable[Mapping[str, Any]]) -> list[Any]:
+        interpreter = self.interpreter
+        bindings = self.bindings
+        statements = self.statements
+        expression = self.expression
+
+        results = []
+        previous = interpreter.environment
+        interpreter.environment = bindings
+        try:
+            for record in records:
+                bindings.values = {
+                    name: float(value) if type(value) is int else value
+                    for name, value in record.items()
+                }
+
+                for statement in statements:
+                    statement.accept(interpreter)
+
+                if expression is not None:
+                    results.append(expression.accept(interpreter))
+                else:
+                    results.append(None)
+        finally:
+            interpreter.environment = previous
+            bindings.values = None
+
+        return results
+
+    def evaluate_columns(self, columns: Mapping[str, Sequence[Any]]) -> list[Any]:
+        names = list(columns)
+        rows = zip(*(columns[name] for name in names), strict=True)
+        return self.evaluate_batch(dict(zip(names, row)) for row in rows)
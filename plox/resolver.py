@@ -0,0 +1,130 @@
+from typing import Any
+
+from environment import InlineCache
+from expr import (
+    Assign,
+    Binary,
+    Call,
+    Expr,
+    ExprVisitor,
+    Grouping,
+    Index,
+    ListLiteral,
+    Literal,
+    Logical,
+    MapLiteral,
+    SetIndex,
+    Unary,
+    Variable,
+)
+from lazy_parser import LazyBlock
+from stmt import Block, Expression, If, Import, Print, Stmt, StmtVisitor, Var, While
+
+OPAQUE = "*"
+
+
+class Resolver(ExprVisitor, StmtVisitor):
+    def __init__(self, scopes: list[set[str]] | None = None) -> None:
+        self.scopes = scopes if scopes is not None else []
+
+    def resolve(self, statements: list[Stmt]) -> None:
+        for statement in statements:
+            statement.accept(self)
+
+    def evaluate(self, expr: Expr) -> None:
+        expr.accept(self)
+
+    def is_global(self, name: str) -> bool:
+        for scope in self.scopes:
+            if name in scope or OPAQUE in scope:
+                return False
+
+        return True
+
+    def bind(self, expr: Assign | Variable) -> None:
+        if self.is_global(expr.name.lexeme):
+            expr.cache = InlineCache()
+        else:
+            expr.cache = None
+
+    def visit_block_stmt(self, stmt: Block) -> Any:
+        if isinstance(stmt, LazyBlock) and stmt.parsed is None:
+            stmt.scopes = [set(scope) for scope in self.scopes]
+            return
+
+        self.scopes.append(set())
+        self.resolve(stmt.statements)
+        self.scopes.pop()
+
+    def visit_expression_stmt(self, stmt: Expression) -> Any:
+        self.evaluate(stmt.expression)
+
+    def visit_if_stmt(self, stmt: If) -> Any:
+        self.evaluate(stmt.condition)
+        stmt.then_branch.accept(self)
+        if stmt.else_branch is not None:
+            stmt.else_branch.accept(self)
+
+    def visit_import_stmt(self, stmt: Import) -> Any:
+        if self.scopes:
+            self.scopes[-1].add(OPAQUE)
+
+    def visit_print_stmt(self, stmt: Print) -> Any:
+        self.evaluate(stmt.expression)
+
+    def visit_var_stmt(self, stmt: Var) -> Any:
+        if stmt.initializer is not None:
+            self.evaluate(stmt.initializer)
+        if self.scopes:
+            self.scopes[-1].add(stmt.name.lexeme)
+
+    def visit_while_stmt(self, stmt: While) -> Any:
+        self.evaluate(stmt.condition)
+        stmt.body.accept(self)
+
+    def visit_assign_expr(self, expr: Assign) -> Any:
+        self.evaluate(expr.value)
+        self.bind(expr)
+
+    def visit_binary_expr(self, expr: Binary) -> Any:
+        self.evaluate(expr.left)
+        self.evaluate(expr.right)
+
+    def visit_call_expr(self, expr: Call) -> Any:
+        self.evaluate(expr.callee)
+        for argument in expr.arguments:
+            self.evaluate(argument)
+
+    def visit_grouping_expr(self, expr: Grouping) -> Any:
+        self.evaluate(expr.expression)
+
+    def visit_index_expr(self, expr: Index) -> Any:
+        self.evaluate(expr.object)
+        self.evaluate(expr.index)
+
+    def visit_list_literal_expr(self, expr: ListLiteral) -> Any:
+        for element in expr.elements:
+            self.evaluate(element)
+
+    def visit_literal_expr(self, expr: Literal) -> Any:
+        return None
+
+    def visit_logical_expr(self, expr: Logical) -> Any:
+        self.evaluate(expr.left)
+        self.evaluate(expr.right)
+
+    def visit_map_literal_expr(self, expr: MapLiteral) -> Any:
+        for key, value in zip(expr.keys, expr.values):
+            self.evaluate(key)
+            self.evaluate(value)
+
+    def visit_set_index_expr(self, expr: SetIndex) -> Any:
+        self.evaluate(expr.object)
+        self.evaluate(expr.index)
+        self.evaluate(expr.value)
+
+    def visit_unary_expr(self, expr: Unary) -> Any:
+        self.evaluate(expr.right)
+
+    def visit_variable_expr(self, expr: Variable) -> Any:
+        self.bind(expr)
@@ -11,6 +11,7 @@ class Scanner:
         "fun",
         "for",
         "if",
+        "import",
         "nil",
         "or",
         "print",
@@ -50,6 +51,12 @@ class Scanner:
                 self.add_token(TokenType.LEFT_BRACE)
             case "}":
                 self.add_token(TokenType.RIGHT_BRACE)
+            case "[":
+                self.add_token(TokenType.LEFT_BRACKET)
+            case "]":
+                self.add_token(TokenType.RIGHT_BRACKET)
+            case ":":
+                self.add_token(TokenType.COLON)
             case ",":
                 self.add_token(TokenType.COMMA)
             case ".":
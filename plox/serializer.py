@@ -0,0 +1,203 @@
+import math
+import struct
+from typing import Any, Mapping
+
+from errors import SerializationError
+from lox_list import LoxList
+from lox_map import LoxMap
+from natives import NativeFunction
+
+
+class Serializer:
+    version = 1
+
+    NIL = 0
+    FALSE = 1
+    TRUE = 2
+    INTEGER = 3
+    FLOAT = 4
+    STRING = 5
+    STRING_REFERENCE = 6
+    LIST = 7
+    MAP = 8
+    OBJECT_REFERENCE = 9
+    NATIVE = 10
+
+    double = struct.Struct("<d")
+
+    def __init__(self, natives: Mapping[str, NativeFunction] | None = None) -> None:
+        self.natives = natives if natives is not None else {}
+
+    def dumps(self, value: Any) -> bytes:
+        self.buffer = bytearray()
+        self.strings: dict[str, int] = {}
+        self.ids: dict[int, int] = {}
+        self.objects: list[LoxList | LoxMap] = []
+
+        self.write(value)
+
+        written = 0
+        while written < len(self.objects):
+            object = self.objects[written]
+            written += 1
+
+            if isinstance(object, LoxList):
+                self.write_size(len(object.elements))
+                for element in object.elements:
+                    self.write(element)
+            else:
+                self.write_size(len(object.entries))
+                for key, element in object.entries.items():
+                    self.write(key)
+                    self.write(element)
+
+        data = bytes(self.buffer)
+        del self.buffer, self.strings, self.ids, self.objects
+        return data
+
+    def write(self, value: Any) -> None:
+        buffer = self.buffer
+
+        if value is None:
+            buffer.append(Serializer.NIL)
+        elif value is True:
+            buffer.append(Serializer.TRUE)
+        elif value is False:
+            buffer.append(Serializer.FALSE)
+        elif isinstance(value, float):
+            if (
+                value.is_integer()
+                and abs(value) < 1 << 53
+                and (value != 0 or math.copysign(1.0, value) > 0)
+            ):
+                integer = int(value)
+                buffer.append(Serializer.INTEGER)
+                self.write_size(integer << 1 if integer >= 0 else ~integer << 1 | 1)
+            else:
+                buffer.append(Serializer.FLOAT)
+                buffer += Serializer.double.pack(value)
+        elif isinstance(value, str):
+            index = self.strings.get(value)
+            if index is not None:
+                buffer.append(Serializer.STRING_REFERENCE)
+                self.write_size(index)
+            else:
+                self.strings[value] = len(self.strings)
+                encoded = value.encode()
+                buffer.append(Serializer.STRING)
+                self.write_size(len(encoded))
+                buffer += encoded
+        elif isinstance(value, (LoxList, LoxMap)):
+            index = self.ids.get(id(value))
+            if index is not None:
+                buffer.append(Serializer.OBJECT_REFERENCE)
+                self.write_size(index)
+            else:
+                self.ids[id(value)] = len(self.objects)
+                self.objects.append(value)
+                is_list = isinstance(value, LoxList)
+                buffer.append(Serializer.LIST if is_list else Serializer.MAP)
+        elif isinstance(value, NativeFunction):
+            encoded = value.name.encode()
+            buffer.append(Serializer.NATIVE)
+            self.write_size(len(encoded))
+            buffer += encoded
+        else:
+            raise SerializationError(f"can't serialize {type(value).__name__}")
+
+    def write_size(self, size: int) -> None:
+        while size >= 0x80:
+            self.buffer.append(size & 0x7F | 0x80)
+            size >>= 7
+        self.buffer.append(size)
+
+    def loads(self, data: bytes) -> Any:
+        self.data = data
+        self.position = 0
+        self.string_table: list[str] = []
+        self.object_table: list[LoxList | LoxMap] = []
+
+        try:
+            value = self.read()
+
+            read = 0
+            while read < len(self.object_table):
+                object = self.object_table[read]
+                read += 1
+
+                size = self.read_size()
+                if isinstance(object, LoxList):
+                    object.elements = [self.read() for _ in range(size)]
+                else:
+                    for _ in range(size):
+                        key = self.read()
+                        object.entries[key] = self.read()
+
+            if self.position != len(self.data):
+                raise SerializationError("trailing data")
+        except (IndexError, struct.error, UnicodeDecodeError, TypeError) as error:
+            raise SerializationError("truncated or corrupt data") from error
+        finally:
+            del self.data, self.string_table, self.object_table
+
+        return value
+
+    def read(self) -> Any:
+        tag = self.data[self.position]
+        self.position += 1
+
+        match tag:
+            case Serializer.NIL:
+                return None
+            case Serializer.FALSE:
+                return False
+            case Serializer.TRUE:
+                return True
+            case Serializer.INTEGER:
+                size = self.read_size()
+                return float(~(size >> 1) if size & 1 else size >> 1)
+            case Serializer.FLOAT:
+                (value,) = Serializer.double.unpack_from(self.data, self.position)
+                self.position += Serializer.double.size
+                return value
+            case Serializer.STRING:
+                string = self.read_string()
+                self.string_table.append(string)
+                return string
+            case Serializer.STRING_REFERENCE:
+                return self.string_table[self.read_size()]
+            case Serializer.LIST | Serializer.MAP:
+                object = LoxList() if tag == Serializer.LIST else LoxMap()
+                self.object_table.append(object)
+                return object
+            case Serializer.OBJECT_REFERENCE:
+                return self.object_table[self.read_size()]
+            case Serializer.NATIVE:
+                name = self.read_string()
+                native = self.natives.get(name)
+                if native is None:
+                    raise SerializationError(f"unknown native function {name!r}")
+                return native
+
+        raise SerializationError(f"unknown tag {tag}")
+
+    def read_string(self) -> str:
+        size = self.read_size()
+        end = self.position + size
+        if end > len(self.data):
+            raise IndexError(end)
+
+        string = self.data[self.position : end].decode()
+        self.position = end
+        return string
+
+    def read_size(self) -> int:
+        size = 0
+        shift = 0
+        while True:
+            byte = self.data[self.position]
+            self.position += 1
+            size |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return size
+            shift += 7
@@ -0,0 +1,186 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+import struct
+from typing import Any, TYPE_CHECKING
+
+from environment import GlobalEnvironment
+from errors import LoxRuntimeError, SerializationError, SnapshotError
+from expr import Call, Variable
+from lox_list import LoxList
+from lox_map import LoxMap
+from module_loader import Module, ModuleLoader
+from natives import NativeFunction
+from serializer import Serializer
+from stmt import Expression, Stmt
+from tokens import Token
+
+if TYPE_CHECKING:
+    from interpreter import Interpreter
+
+
+class Snapshot:
+    magic = b"PLOXSNAP"
+    version = 1
+
+    header = struct.Struct("<HI")
+
+    def __init__(
+        self, script: str, save: str | None = None, load: str | None = None
+    ) -> None:
+        self.script = script
+        self.save_path = save
+        self.load_path = load
+
+    def attach(self, interpreter: Interpreter, statements: list[Stmt]) -> list[Stmt]:
+        if self.load_path is not None:
+            statements = self.restore(interpreter, statements)
+
+        if self.save_path is not None:
+            interpreter.globals.define(
+                "snapshot",
+                NativeFunction(
+                    "snapshot",
+                    0,
+                    lambda arguments, paren: self.save(interpreter, statements, paren),
+                ),
+            )
+
+        return statements
+
+    def save(
+        self, interpreter: Interpreter, statements: list[Stmt], paren: Token
+    ) -> Any:
+        assert self.save_path is not None
+
+        for index, statement in enumerate(statements):
+            call = Snapshot.marker(statement)
+            if call is not None and call.paren is paren:
+                break
+        else:
+            raise LoxRuntimeError(paren, "snapshot() must be a top-level statement")
+
+        with open(self.script, "rb") as file:
+            source = Snapshot.prefix(file.read(), paren.line)
+
+        modules = list(ModuleLoader.modules.items())
+        roots = LoxList([LoxMap(dict(interpreter.globals.values))])
+        for _, module in modules:
+            roots.append(LoxMap(dict(module.environment.values)))
+
+        try:
+            payload = Serializer().dumps(roots)
+        except SerializationError as error:
+            raise LoxRuntimeError(paren, f"can't snapshot the heap: {error}") from None
+
+        header = json.dumps(
+            {
+                "serializer": Serializer.version,
+                "line": paren.line,
+                "index": index,
+                "source": hashlib.sha256(source).hexdigest(),
+                "modules": [[path, Snapshot.digest(path)] for path, _ in modules],
+            }
+        ).encode()
+
+        temporary = f"{self.save_path}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as file:
+            file.write(Snapshot.magic)
+            file.write(Snapshot.header.pack(Snapshot.version, len(header)))
+            file.write(header)
+            file.write(payload)
+        os.replace(temporary, self.save_path)
+
+        return None
+
+    def restore(self, interpreter: Interpreter, statements: list[Stmt]) -> list[Stmt]:
+        assert self.load_path is not None
+
+        try:
+            with open(self.load_path, "rb") as file:
+                data = file.read()
+        except OSError as error:
+            raise SnapshotError(f"can't read snapshot: {error.strerror}") from None
+
+        start = len(Snapshot.magic)
+        if len(data) < start + Snapshot.header.size or data[:start] != Snapshot.magic:
+            raise SnapshotError(f"{self.load_path!r} is not a snapshot")
+
+        version, size = Snapshot.header.unpack_from(data, start)
+        start += Snapshot.header.size
+        if version != Snapshot.version:
+            raise SnapshotError(f"unsupported snapshot version {version}")
+
+        try:
+            header = json.loads(data[start : start + size])
+            serializer = header["serializer"]
+            line = int(header["line"])
+            index = int(header["index"])
+            modules = [(str(path), str(digest)) for path, digest in header["modules"]]
+            source_digest = header["source"]
+        except (ValueError, KeyError, TypeError):
+            raise SnapshotError("corrupt snapshot header") from None
+        if serializer != Serializer.version:
+            raise SnapshotError("snapshot was written by another serializer version")
+
+        with open(self.script, "rb") as file:
+            source = Snapshot.prefix(file.read(), line)
+        if hashlib.sha256(source).hexdigest() != source_digest:
+            raise SnapshotError(f"script changed up to line {line} since the snapshot")
+
+        for path, digest in modules:
+            if not os.path.isfile(path) or Snapshot.digest(path) != digest:
+                raise SnapshotError(f"module {path!r} changed since the snapshot")
+
+        call = Snapshot.marker(statements[index]) if index < len(statements) else None
+        if call is None or call.paren.line != line:
+            raise SnapshotError(f"no snapshot() marker at line {line}")
+
+        natives = {
+            name: value
+            for name, value in interpreter.globals.values.items()
+            if isinstance(value, NativeFunction)
+        }
+        try:
+            roots = Serializer(natives).loads(data[start + size :])
+        except SerializationError as error:
+            raise SnapshotError(f"corrupt snapshot: {error}") from None
+
+        if not isinstance(roots, LoxList) or len(roots) != len(modules) + 1:
+            raise SnapshotError("corrupt snapshot: unexpected roots")
+        if not all(isinstance(root, LoxMap) for root in roots.elements):
+            raise SnapshotError("corrupt snapshot: unexpected roots")
+
+        environments = [root.entries for root in roots.elements]
+        interpreter.globals.replace(environments[0])
+        for (path, _), values in zip(modules, environments[1:]):
+            environment = GlobalEnvironment()
+            environment.replace(values)
+            ModuleLoader.modules[path] = Module(path, environment)
+
+        return statements[index + 1 :]
+
+    @staticmethod
+    def marker(statement: Stmt) -> Call | None:
+        if isinstance(statement, Expression) and isinstance(statement.expression, Call):
+            callee = statement.expression.callee
+            if isinstance(callee, Variable) and callee.name.lexeme == "snapshot":
+                return statement.expression
+
+        return None
+
+    @staticmethod
+    def prefix(source: bytes, line: int) -> bytes:
+        end = -1
+        for _ in range(line + 1):
+            end = source.find(b"\n", end + 1)
+            if end == -1:
+                return source
+
+        return source[: end + 1]
+
+    @staticmethod
+    def digest(path: str) -> str:
+        with open(path, "rb") as file:
+            return hashlib.sha256(file.read()).hexdigest()
@@ -0,0 +1,153 @@
+from __future__ import annotations
+import json
+from collections import Counter
+from typing import Any, Callable, TYPE_CHECKING
+
+from environment import Environment
+from stmt import Stmt
+
+if TYPE_CHECKING:
+    from interpreter import Interpreter
+
+
+class Stats:
+    version = 2
+
+    def __init__(self) -> None:
+        self.allocations = Environment.allocations
+        self.scopes = 0
+        self.lookups = 0
+        self.lookup_depth_total = 0
+        self.lookup_depth_max = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.probes = 0
+        self.concatenated = 0
+        self.evaluations: Counter[str] = Counter()
+        self.max_statements = 0
+        self.max_tokens = 0
+        self.tokens = 0
+
+    def install(self, interpreter: Interpreter) -> None:
+        for name in dir(interpreter):
+            if name.startswith("visit_"):
+                node = name.removeprefix("visit_")
+                visit = getattr(interpreter, name)
+                setattr(interpreter, name, self.counting(node, visit))
+
+        for name in ("visit_variable_expr", "visit_assign_expr"):
+            visit = getattr(interpreter, name)
+            setattr(interpreter, name, self.measuring(interpreter, visit))
+
+        visit_binary_expr = interpreter.visit_binary_expr
+
+        def concatenating(expr: Any) -> Any:
+            value = visit_binary_expr(expr)
+            if type(value) is str:
+                self.concatenated += len(value.encode())
+            return value
+
+        setattr(interpreter, "visit_binary_expr", concatenating)
+
+        interpret = interpreter.interpret
+        execute_block = interpreter.execute_block
+
+        def counted_interpret(statements: list[Stmt]) -> None:
+            self.record_statements(len(statements))
+            interpret(statements)
+
+        def counted_execute_block(
+            statements: list[Stmt], environment: Environment
+        ) -> None:
+            self.scopes += 1
+            self.record_statements(len(statements))
+            execute_block(statements, environment)
+
+        setattr(interpreter, "interpret", counted_interpret)
+        setattr(interpreter, "execute_block", counted_execute_block)
+
+    def counting(self, node: str, visit: Callable[[Any], Any]) -> Callable[[Any], Any]:
+        evaluations = self.evaluations
+
+        def counted(node_object: Any) -> Any:
+            evaluations[node] += 1
+            return visit(node_object)
+
+        return counted
+
+    def measuring(
+        self, interpreter: Interpreter, visit: Callable[[Any], Any]
+    ) -> Callable[[Any], Any]:
+        def measured(expr: Any) -> Any:
+            name = expr.name.lexeme
+            environment: Environment | None = interpreter.environment
+            depth = 0
+            while environment is not None and (
+                environment.values is None or name not in environment.values
+            ):
+                environment = environment.enclosing
+                depth += 1
+
+            self.record_lookup(depth)
+            if expr.cache is None:
+                self.probes += depth + (environment is not None)
+            elif expr.cache.version == interpreter.globals.version:
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
+                self.probes += 1
+
+            return visit(expr)
+
+        return measured
+
+    @property
+    def environments(self) -> int:
+        return Environment.allocations - self.allocations
+
+    def record_lookup(self, depth: int) -> None:
+        self.lookups += 1
+        self.lookup_depth_total += depth
+        if depth > self.lookup_depth_max:
+            self.lookup_depth_max = depth
+
+    def record_statements(self, count: int) -> None:
+        if count > self.max_statements:
+            self.max_statements = count
+
+    def record_tokens(self, count: int) -> None:
+        self.tokens += count
+        if count > self.max_tokens:
+            self.max_tokens = count
+
+    def as_dict(self) -> dict[str, Any]:
+        average = self.lookup_depth_total / self.lookups if self.lookups else 0.0
+        return {
+            "environments": self.environments,
+            "scopes": self.scopes,
+            "lookups": self.lookups,
+            "lookup_depth": {"average": average, "max": self.lookup_depth_max},
+            "global_cache": {"hits": self.cache_hits, "misses": self.cache_misses},
+            "evaluations": dict(sorted(self.evaluations.items())),
+            "max_statements": self.max_statements,
+            "max_tokens": self.max_tokens,
+        }
+
+    def profile(self) -> dict[str, int]:
+        counters = {
+            "environments": self.environments,
+            "scopes": self.scopes,
+            "probes": self.probes,
+            "tokens": self.tokens,
+            "concatenated_bytes": self.concatenated,
+            "evaluations": sum(self.evaluations.values()),
+        }
+        for node, count in sorted(self.evaluations.items()):
+            counters[f"evaluations.{node}"] = count
+        return counters
+
+    def save(self, path: str) -> None:
+        with open(path, "w") as file:
+            data = {"version": Stats.version, "counters": self.profile()}
+            json.dump(data, file, indent=2)
+            file.write("\n")
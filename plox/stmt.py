@@ -7,6 +7,8 @@ from tokens import Token
 
 
 class Stmt(ABC):
+    line: int = 0
+
     @abstractmethod
     def accept(self, visitor: StmtVisitor) -> Any:
         pass
@@ -25,6 +27,10 @@ class StmtVisitor(ABC):
     def visit_if_stmt(self, stmt: If) -> Any:
         pass
 
+    @abstractmethod
+    def visit_import_stmt(self, stmt: Import) -> Any:
+        pass
+
     @abstractmethod
     def visit_print_stmt(self, stmt: Print) -> Any:
         pass
@@ -66,6 +72,15 @@ class If(Stmt):
         return visitor.visit_if_stmt(self)
 
 
+class Import(Stmt):
+    def __init__(self, keyword: Token, path: Token) -> None:
+        self.keyword = keyword
+        self.path = path
+
+    def accept(self, visitor: StmtVisitor) -> Any:
+        return visitor.visit_import_stmt(self)
+
+
 class Print(Stmt):
     def __init__(self, expression: Expr) -> None:
         self.expression = expression
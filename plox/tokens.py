@@ -8,6 +8,9 @@ class TokenType(Enum):
     RIGHT_PAREN = ")"
     LEFT_BRACE = "{"
     RIGHT_BRACE = "}"
+    LEFT_BRACKET = "["
+    RIGHT_BRACKET = "]"
+    COLON = ":"
     COMMA = ","
     DOT = "."
     MINUS = "-"
@@ -39,6 +42,7 @@ class TokenType(Enum):
     FUN = "fun"
     FOR = "for"
     IF = "if"
+    IMPORT = "import"
     NIL = "nil"
     OR = "or"
     PRINT = "print"
@@ -54,6 +58,8 @@ class TokenType(Enum):
 
 
 class Token:
+    __slots__ = ("type", "lexeme", "literal", "line")
+
     def __init__(self, type: TokenType, lexeme: str, literal: Any, line: int) -> None:
         self.type = type
         self.lexeme = lexeme
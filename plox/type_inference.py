@@ -0,0 +1,294 @@
+from __future__ import annotations
+from enum import Enum
+from typing import Any
+
+from expr import (
+    Assign,
+    Binary,
+    Call,
+    Expr,
+    ExprVisitor,
+    Grouping,
+    Index,
+    ListLiteral,
+    Literal,
+    Logical,
+    MapLiteral,
+    SetIndex,
+    Unary,
+    Variable,
+)
+from lazy_parser import LazyBlock
+from stmt import Block, Expression, If, Import, Print, Stmt, StmtVisitor, Var, While
+from tokens import TokenType
+
+
+class Type(Enum):
+    NUMBER = "number"
+    STRING = "string"
+    BOOLEAN = "boolean"
+    NIL = "nil"
+    UNKNOWN = "unknown"
+
+    def join(self, other: Type) -> Type:
+        return self if self == other else Type.UNKNOWN
+
+
+class Scope:
+    def __init__(
+        self, types: dict[str, Type] | None = None, opaque: bool = False
+    ) -> None:
+        self.types = types if types is not None else {}
+        self.opaque = opaque
+
+
+Changes = dict[tuple[int, str], tuple[Scope, str, Type | None]]
+
+
+class TypeInference(ExprVisitor, StmtVisitor):
+    arithmetic = (
+        TokenType.MINUS,
+        TokenType.SLASH,
+        TokenType.STAR,
+        TokenType.GREATER,
+        TokenType.GREATER_EQUAL,
+        TokenType.LESS,
+        TokenType.LESS_EQUAL,
+    )
+
+    def __init__(self, scopes: list[Scope] | None = None) -> None:
+        self.scopes = scopes if scopes is not None else [Scope()]
+        self.journal: list[tuple[Scope, str, Type | None]] = []
+        self.proven: dict[int, tuple[Expr, bool]] = {}
+
+    def infer(self, statements: list[Stmt]) -> None:
+        for statement in statements:
+            self.execute(statement)
+
+        for expr, proven in self.proven.values():
+            expr.unchecked = proven
+
+    def evaluate(self, expr: Expr) -> Type:
+        result: Type = expr.accept(self)
+        return result
+
+    def execute(self, stmt: Stmt) -> None:
+        stmt.accept(self)
+
+    def mark(self, expr: Expr, proven: bool) -> None:
+        previous = self.proven.get(id(expr))
+        if previous is not None:
+            proven = proven and previous[1]
+        self.proven[id(expr)] = (expr, proven)
+
+    def set(self, scope: Scope, name: str, type: Type) -> None:
+        self.journal.append((scope, name, scope.types.get(name)))
+        scope.types[name] = type
+
+    def undo(self, mark: int) -> Changes:
+        changes: Changes = {}
+        while len(self.journal) > mark:
+            scope, name, previous = self.journal.pop()
+            changes.setdefault((id(scope), name), (scope, name, scope.types.get(name)))
+            if previous is None:
+                del scope.types[name]
+            else:
+                scope.types[name] = previous
+
+        return changes
+
+    def merge(self, left: Changes, right: Changes) -> bool:
+        widened = False
+        for key in left.keys() | right.keys():
+            scope, name, _ = left[key] if key in left else right[key]
+            original = scope.types.get(name)
+            if original is None:
+                continue
+
+            first, second = (
+                changes[key][2] if key in changes else original
+                for changes in (left, right)
+            )
+            joined = Type.UNKNOWN
+            if first is not None and second is not None:
+                joined = first.join(second)
+
+            if joined != original:
+                self.set(scope, name, joined)
+                widened = True
+
+        return widened
+
+    def lookup(self, name: str) -> Type:
+        for scope in reversed(self.scopes):
+            if name in scope.types:
+                return scope.types[name]
+            if scope.opaque:
+                break
+
+        return Type.UNKNOWN
+
+    def assign(self, name: str, type: Type) -> None:
+        for depth in range(len(self.scopes) - 1, -1, -1):
+            scope = self.scopes[depth]
+            if name in scope.types:
+                self.set(scope, name, type)
+                return
+            if scope.opaque:
+                for outer in self.scopes[:depth]:
+                    if name in outer.types:
+                        self.set(outer, name, outer.types[name].join(type))
+                return
+
+    def visit_block_stmt(self, stmt: Block) -> Any:
+        if isinstance(stmt, LazyBlock) and stmt.parsed is None:
+            context = {name: self.lookup(name) for name in stmt.identifiers}
+            if stmt.context is not None:
+                for name, type in stmt.context.types.items():
+                    context[name] = context[name].join(type)
+            stmt.context = Scope(context)
+
+            for name in stmt.names:
+                self.assign(name, Type.UNKNOWN)
+            return
+
+        self.scopes.append(Scope())
+        try:
+            for statement in stmt.statements:
+                self.execute(statement)
+        finally:
+            self.scopes.pop()
+
+    def visit_expression_stmt(self, stmt: Expression) -> Any:
+        self.evaluate(stmt.expression)
+
+    def visit_if_stmt(self, stmt: If) -> Any:
+        self.evaluate(stmt.condition)
+
+        mark = len(self.journal)
+        self.execute(stmt.then_branch)
+        then_changes = self.undo(mark)
+
+        if stmt.else_branch is not None:
+            self.execute(stmt.else_branch)
+        else_changes = self.undo(mark)
+
+        self.merge(then_changes, else_changes)
+
+    def visit_import_stmt(self, stmt: Import) -> Any:
+        scope = self.scopes[-1]
+        for name in scope.types:
+            self.set(scope, name, Type.UNKNOWN)
+        scope.opaque = True
+
+    def visit_print_stmt(self, stmt: Print) -> Any:
+        self.evaluate(stmt.expression)
+
+    def visit_var_stmt(self, stmt: Var) -> Any:
+        type = Type.NIL
+        if stmt.initializer is not None:
+            type = self.evaluate(stmt.initializer)
+
+        self.set(self.scopes[-1], stmt.name.lexeme, type)
+
+    def visit_while_stmt(self, stmt: While) -> Any:
+        while True:
+            mark = len(self.journal)
+            self.evaluate(stmt.condition)
+            self.execute(stmt.body)
+            if not self.merge(self.undo(mark), {}):
+                break
+
+        self.evaluate(stmt.condition)
+
+    def visit_assign_expr(self, expr: Assign) -> Any:
+        type = self.evaluate(expr.value)
+        self.assign(expr.name.lexeme, type)
+        return type
+
+    def visit_binary_expr(self, expr: Binary) -> Any:
+        left = self.evaluate(expr.left)
+        right = self.evaluate(expr.right)
+        operator = expr.operator.type
+
+        if operator in TypeInference.arithmetic:
+            self.mark(expr, left == Type.NUMBER and right == Type.NUMBER)
+            if operator in (TokenType.MINUS, TokenType.SLASH, TokenType.STAR):
+                return Type.NUMBER
+            return Type.BOOLEAN
+
+        if operator == TokenType.PLUS:
+            if left == right and left in (Type.NUMBER, Type.STRING):
+                self.mark(expr, True)
+                return left
+
+            self.mark(expr, False)
+            return Type.UNKNOWN
+
+        return Type.BOOLEAN
+
+    def visit_call_expr(self, expr: Call) -> Any:
+        self.evaluate(expr.callee)
+        for argument in expr.arguments:
+            self.evaluate(argument)
+
+        return Type.UNKNOWN
+
+    def visit_grouping_expr(self, expr: Grouping) -> Any:
+        return self.evaluate(expr.expression)
+
+    def visit_index_expr(self, expr: Index) -> Any:
+        self.evaluate(expr.object)
+        self.evaluate(expr.index)
+        return Type.UNKNOWN
+
+    def visit_list_literal_expr(self, expr: ListLiteral) -> Any:
+        for element in expr.elements:
+            self.evaluate(element)
+
+        return Type.UNKNOWN
+
+    def visit_literal_expr(self, expr: Literal) -> Any:
+        if expr.value is None:
+            return Type.NIL
+        if isinstance(expr.value, bool):
+            return Type.BOOLEAN
+        if isinstance(expr.value, float):
+            return Type.NUMBER
+        if isinstance(expr.value, str):
+            return Type.STRING
+
+        return Type.UNKNOWN
+
+    def visit_logical_expr(self, expr: Logical) -> Any:
+        left = self.evaluate(expr.left)
+
+        mark = len(self.journal)
+        right = self.evaluate(expr.right)
+        self.merge(self.undo(mark), {})
+
+        return left.join(right)
+
+    def visit_map_literal_expr(self, expr: MapLiteral) -> Any:
+        for key, value in zip(expr.keys, expr.values):
+            self.evaluate(key)
+            self.evaluate(value)
+
+        return Type.UNKNOWN
+
+    def visit_set_index_expr(self, expr: SetIndex) -> Any:
+        self.evaluate(expr.object)
+        self.evaluate(expr.index)
+        return self.evaluate(expr.value)
+
+    def visit_unary_expr(self, expr: Unary) -> Any:
+        right = self.evaluate(expr.right)
+
+        if expr.operator.type == TokenType.MINUS:
+            self.mark(expr, right == Type.NUMBER)
+            return Type.NUMBER
+
+        return Type.BOOLEAN
+
+    def visit_variable_expr(self, expr: Variable) -> Any:
+        return self.lookup(expr.name.lexeme)
@@ -1,3 +1,4 @@
+import re
 import sys
 from io import TextIOWrapper
 
@@ -21,13 +22,19 @@ class GenerateAst:
             {
                 "Assign": "name: Token, value: Expr",
                 "Binary": "left: Expr, operator: Token, right: Expr",
+                "Call": "callee: Expr, paren: Token, arguments: list[Expr]",
                 "Grouping": "expression: Expr",
+                "Index": "object: Expr, bracket: Token, index: Expr",
+                "ListLiteral": "bracket: Token, elements: list[Expr]",
                 "Literal": "value: Any",
                 "Logical": "left: Expr, operator: Token, right: Expr",
+                "MapLiteral": "brace: Token, keys: list[Expr], values: list[Expr]",
+                "SetIndex": "object: Expr, bracket: Token, index: Expr, value: Expr",
                 "Unary": "operator: Token, right: Expr",
                 "Variable": "name: Token",
             },
-            ["from tokens import Token"],
+            ["from environment import InlineCache", "from tokens import Token"],
+            ["unchecked: bool = False", "cache: InlineCache | None = None"],
         )
         GenerateAst.define_ast(
             output_dir,
@@ -36,6 +43,7 @@ class GenerateAst:
                 "Block": "statements: list[Stmt]",
                 "Expression": "expression: Expr",
                 "If": "condition: Expr, then_branch: Stmt, else_branch: Stmt | None",
+                "Import": "keyword: Token, path: Token",
                 "Print": "expression: Expr",
                 "Var": "name: Token, initializer: Expr | None",
                 "While": "condition: Expr, body: Stmt",
@@ -44,11 +52,16 @@ class GenerateAst:
                 "from expr import Expr",
                 "from tokens import Token",
             ],
+            ["line: int = 0"],
         )
 
     @staticmethod
     def define_ast(
-        output_dir: str, base_name: str, types: dict[str, str], imports: list[str]
+        output_dir: str,
+        base_name: str,
+        types: dict[str, str],
+        imports: list[str],
+        attributes: list[str],
     ) -> None:
         path = f"{output_dir}/{base_name.lower()}.py"
 
@@ -67,6 +80,9 @@ class GenerateAst:
             file.write(NEWLINE * 3)
             file.write(f"class {base_name}(ABC):")
             file.write(NEWLINE)
+            for attribute in attributes:
+                file.write(INDENTATION + attribute)
+                file.write(NEWLINE * 2)
             file.write(INDENTATION + "@abstractmethod")
             file.write(NEWLINE)
             file.write(
@@ -101,10 +117,8 @@ class GenerateAst:
             INDENTATION + f"def accept(self, visitor: {base_name}Visitor) -> Any:"
         )
         file.write(NEWLINE)
-        file.write(
-            INDENTATION * 2
-            + f"return visitor.visit_{class_name.lower()}_{base_name.lower()}(self)"
-        )
+        visit_name = f"visit_{GenerateAst.snake_case(class_name)}_{base_name.lower()}"
+        file.write(INDENTATION * 2 + f"return visitor.{visit_name}(self)")
         file.write(NEWLINE)
 
     @staticmethod
@@ -120,12 +134,17 @@ class GenerateAst:
             file.write(NEWLINE)
             file.write(
                 INDENTATION
-                + f"def visit_{type_name.lower()}_{name.lower()}(self, {name.lower()}: {type_name}) -> Any:"
+                + f"def visit_{GenerateAst.snake_case(type_name)}_{name}"
+                + f"(self, {name}: {type_name}) -> Any:"
             )
             file.write(NEWLINE)
             file.write(INDENTATION * 2 + "pass")
             file.write(NEWLINE)
 
+    @staticmethod
+    def snake_case(name: str) -> str:
+        return re.sub(r"(?<!^)(?=[A-Z])", "_", name).lower()
+
 
 if __name__ == "__main__":
     GenerateAst.main()